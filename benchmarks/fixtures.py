@@ -0,0 +1,42 @@
+# Benchmark Fixtures
+# Synthetic loan and market inputs, so the benchmarks need neither the Excel workbook nor openpyxl.
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+
+S0 = 1.17
+MU = 0.0
+SIGMA = 0.08
+VOL_1Y = 0.072
+VOL_5Y = 0.080
+
+def synthetic_cashflows(
+        horizon_years: float,
+        n_cashflows: int,
+        start_date: pd.Timestamp = pd.Timestamp('2025-08-01'),
+        notional: float = 10_000_000.0,
+        coupon: float = 0.10
+) -> pd.DataFrame:
+    """
+    cashflows_loader-style frame: a drawdown two months after start_date, n_cashflows - 1 evenly spaced
+    coupons up to start_date + horizon_years, principal repaid with the last one.
+    """
+    if n_cashflows < 2:
+        raise ValueError('n_cashflows must be at least 2.')
+    first = start_date + pd.DateOffset(months=2)
+    end = start_date + pd.DateOffset(days=int(round(365 * horizon_years)))
+    dates = pd.DatetimeIndex(np.linspace(first.value, end.value, n_cashflows)).normalize()
+
+    cf_eur = np.full(n_cashflows, notional * coupon / (n_cashflows - 1))
+    cf_eur[0] = -notional
+    cf_eur[-1] += notional
+    df = pd.DataFrame({'cf_eur': cf_eur}, index=dates)
+    df.index.rename('date', inplace=True)
+    return df
+
+def benchmark_variables(
+        n_paths: int
+) -> GlobalVariables:
+    return GlobalVariables(n_paths=n_paths, seed=0, cache_dir=None)
@@ -0,0 +1,252 @@
+# Benchmark Suite
+"""
+Times the production stages on synthetic fixtures (benchmarks/fixtures.py) over a grid of path counts,
+horizons and cashflow counts, and optionally compares against a stored baseline.
+
+    python -m benchmarks.run --preset quick --compare benchmarks/baseline.json
+    python -m benchmarks.run --preset full --save results.json
+    python -m benchmarks.run --preset quick --save-baseline benchmarks/baseline.json
+
+Per case and stage it records wall time (best of --repeat runs), peak traced memory (tracemalloc, one extra
+run) and paths per second. The original per-path irr / npv loops are timed on a SCALAR_SAMPLE path subsample
+as baselines for the batch kernels, and each case reports the batch speed-up over them.
+
+Every wall time is also stored relative to a fixed NumPy reference workload timed in the same run, which
+takes most of the machine out of the numbers. The committed benchmarks/baseline.json (written with
+--save-baseline) holds only these ratios, peak memory and speed-ups; --save writes the full results. A stage
+regresses when its relative time exceeds the baseline's by more than --time-tolerance (plus --time-slack
+seconds) or its peak memory by more than --memory-tolerance; the run then exits with status 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from itertools import product
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import MU, S0, SIGMA, VOL_1Y, VOL_5Y, benchmark_variables, synthetic_cashflows
+from src.fx_simulator import simulate_gbm_paths
+from src.hedges.forwards import forward_hedge_cashflows_usd
+from src.hedges.options import put_option_hedge_cashflows_usd
+from src.metrics.performance import irr, irr_batch, npv, npv_batch
+from src.metrics.risk import risk_summary_for_metric
+from src.schedule import Schedule
+
+PRESETS = {
+    'quick': {'paths': (10_000,), 'horizons': (5,), 'cashflows': (5, 20)},
+    'full': {'paths': (10_000, 100_000, 1_000_000), 'horizons': (2, 5, 10), 'cashflows': (5, 20, 60)},
+}
+
+FULL_GRID_MAX_ELEMENTS = 50_000_000           # Skip the full daily grid above ~400 MB of paths (2x the elements in float32)
+SCALAR_SAMPLE = 2_000                         # Paths the per-path irr / npv loop baselines run on
+SPEEDUPS = {'irr_batch': 'irr_loop', 'npv_batch': 'npv_loop'}
+
+def _reference_workload() -> Callable[[], object]:
+    """
+    Fixed NumPy workload (sort, exp, matrix product) that the stage timings are expressed relative to.
+    """
+    x = np.random.default_rng(0).standard_normal(2**20)
+    m = x[:2**18].reshape(512, 512)
+    return lambda: (np.sort(x), np.exp(x), m @ m)
+
+def _measure(
+        stage: Callable[[], object],
+        n_paths: int,
+        repeat: int
+) -> dict:
+    """
+    One untimed warm-up run (lazy imports, caches, first-touch allocations), best-of-repeat wall time, then
+    one tracemalloc run for the peak memory allocated by the stage.
+    """
+    stage()
+    wall = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        stage()
+        wall = min(wall, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'wall_s': wall, 'peak_mb': peak / 2**20, 'paths_per_s': n_paths / wall if wall > 0 else np.inf}
+
+def run_case(
+        n_paths: int,
+        horizon_years: float,
+        n_cashflows: int,
+        repeat: int = 3
+) -> dict:
+    """
+    Benchmarks one (n_paths, horizon, n_cashflows) case. Stages run on the outputs of the previous ones,
+    which are built once outside the timings.
+    """
+    gv = benchmark_variables(n_paths)
+    cashflows = synthetic_cashflows(horizon_years=horizon_years, n_cashflows=n_cashflows,
+                                    start_date=gv.analysis_start_date)
+    start, end = gv.analysis_start_date, cashflows.index.max()
+    n_days = len(pd.bdate_range(start=start, end=end))
+
+    simulate = dict(s0=S0, mu=MU, sigma=SIGMA, start=start, end=end, n_paths=n_paths,
+                    steps_per_year=gv.steps_per_year, seed=gv.seed)
+    path_dates, spots = simulate_gbm_paths(**simulate, sample_dates=cashflows.index)
+    schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=path_dates, s0=S0, global_variables=gv)
+    hedge = dict(spot_paths=spots, path_dates=path_dates, cashflow_dates=schedule.cashflow_dates,
+                 cashflow_eur=schedule.cashflow_eur, s0=S0, r_domestic=gv.r_domestic, r_foreign=gv.r_foreign,
+                 hedge_ratio=gv.hedging_ratio, start_date=start, schedule=schedule)
+    cashflows_usd = schedule.cashflow_eur * spots[:, schedule.grid_idx]
+    npvs = npv_batch(cashflows_matrix=cashflows_usd, discount_factors=schedule.discount_factors)
+
+    sample = cashflows_usd[:SCALAR_SAMPLE]
+    stages = {
+        'simulate_sampled': lambda: simulate_gbm_paths(**simulate, sample_dates=cashflows.index),
+        'forward_hedge': lambda: forward_hedge_cashflows_usd(**hedge),
+        'put_hedge': lambda: put_option_hedge_cashflows_usd(**hedge, vol_1y=VOL_1Y, vol_5y=VOL_5Y),
+        'irr_batch': lambda: irr_batch(cashflow_dates=schedule.cashflow_dates, cashflows_matrix=cashflows_usd,
+                                       schedule=schedule),
+        'npv_batch': lambda: npv_batch(cashflows_matrix=cashflows_usd, discount_factors=schedule.discount_factors),
+        'risk_summary': lambda: risk_summary_for_metric(npvs, alpha=gv.alpha, loss='npv_shortfall'),
+    }
+    if n_paths * n_days <= FULL_GRID_MAX_ELEMENTS:
+        stages['simulate_full_grid'] = lambda: simulate_gbm_paths(**simulate)
+    if n_paths * n_days <= 2 * FULL_GRID_MAX_ELEMENTS:
+        stages['simulate_full_grid_float32'] = lambda: simulate_gbm_paths(**simulate, dtype=np.float32)
+
+    # The notebook's per-path loops, on a subsample (paths_per_s stays comparable)
+    loops = {
+        'irr_loop': lambda: [irr(cashflow_dates=schedule.cashflow_dates, cashflows=row, schedule=schedule)
+                             for row in sample],
+        'npv_loop': lambda: [npv(cashflow_dates=schedule.cashflow_dates, cashflows=row, r=gv.discount_rate,
+                                 schedule=schedule) for row in sample],
+    }
+
+    results = {name: _measure(stage, n_paths=n_paths, repeat=repeat) for name, stage in stages.items()}
+    results.update({name: _measure(loop, n_paths=len(sample), repeat=repeat) for name, loop in loops.items()})
+    for batch, loop in SPEEDUPS.items():
+        results[batch]['speedup'] = results[batch]['paths_per_s'] / results[loop]['paths_per_s']
+    return results
+
+def case_key(
+        n_paths: int,
+        horizon_years: float,
+        n_cashflows: int
+) -> str:
+    return f'paths={n_paths}|horizon={horizon_years}y|cashflows={n_cashflows}'
+
+def run_suite(
+        paths: tuple[int, ...],
+        horizons: tuple[float, ...],
+        cashflows: tuple[int, ...],
+        repeat: int = 3
+) -> dict:
+    reference = _measure(_reference_workload(), n_paths=1, repeat=max(repeat, 5))['wall_s']
+    print(f'reference workload {reference:.4f} s', flush=True)
+    results = {}
+    for n_paths, horizon, n_cashflows in product(paths, horizons, cashflows):
+        key = case_key(n_paths, horizon, n_cashflows)
+        print(key, flush=True)
+        results[key] = run_case(n_paths=n_paths, horizon_years=horizon, n_cashflows=n_cashflows, repeat=repeat)
+        for stage, r in results[key].items():
+            r['relative'] = r['wall_s'] / reference
+            speedup = f"  {r['speedup']:8,.0f}x loop" if 'speedup' in r else ''
+            print(f"  {stage:<28} {r['wall_s']:10.4f} s  {r['peak_mb']:10.1f} MB  {r['paths_per_s']:14,.0f} paths/s{speedup}")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'reference_s': reference,
+        },
+        'results': results,
+    }
+
+def baseline_view(
+        results: dict
+) -> dict:
+    """
+    The machine-independent part of run_suite results: relative times, peak memory and speed-ups.
+    """
+    keep = ('relative', 'peak_mb', 'speedup')
+    return {
+        'meta': {k: results['meta'][k] for k in ('python', 'numpy', 'pandas')},
+        'results': {
+            key: {stage: {k: r[k] for k in keep if k in r} for stage, r in stages.items()}
+            for key, stages in results['results'].items()
+        },
+    }
+
+def compare(
+        current: dict,
+        baseline: dict,
+        time_tolerance: float = 0.25,
+        memory_tolerance: float = 0.10,
+        time_slack: float = 0.002
+) -> list[str]:
+    """
+    Regressions of current against baseline, for the (case, stage) pairs both contain. Times are compared
+    relative to each run's reference workload. Time gets time_slack seconds and memory 1 MB of absolute
+    slack so sub-millisecond stages do not flap.
+    """
+    slack = time_slack / current['meta']['reference_s']
+    regressions = []
+    for key, stages in current['results'].items():
+        for stage, r in stages.items():
+            b = baseline['results'].get(key, {}).get(stage)
+            if b is None:
+                continue
+            if r['relative'] > b['relative'] * (1 + time_tolerance) + slack:
+                regressions.append(f"{key} {stage}: {r['relative']:.3f}x reference vs baseline {b['relative']:.3f}x")
+            if r['peak_mb'] > b['peak_mb'] * (1 + memory_tolerance) + 1.0:
+                regressions.append(f"{key} {stage}: peak {r['peak_mb']:.1f}MB vs baseline {b['peak_mb']:.1f}MB")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark simulation, hedging, metrics and risk stages.')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--paths', type=int, nargs='+')
+    parser.add_argument('--horizons', type=float, nargs='+')
+    parser.add_argument('--cashflows', type=int, nargs='+')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='write the full results JSON')
+    parser.add_argument('--save-baseline', help='write the machine-independent results (baseline_view) JSON')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--time-tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-tolerance', type=float, default=0.10)
+    parser.add_argument('--time-slack', type=float, default=0.002, help='absolute wall-time slack in seconds')
+    args = parser.parse_args(argv)
+
+    grid = PRESETS[args.preset]
+    current = run_suite(
+        paths=tuple(args.paths or grid['paths']),
+        horizons=tuple(h if h != int(h) else int(h) for h in (args.horizons or grid['horizons'])),
+        cashflows=tuple(args.cashflows or grid['cashflows']),
+        repeat=args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(baseline_view(current), f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.time_tolerance, args.memory_tolerance, args.time_slack)
+        for line in regressions:
+            print('REGRESSION', line)
+        if regressions:
+            return 1
+        print('No regressions against', args.compare)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
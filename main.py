@@ -0,0 +1,239 @@
+# Command-Line Batch Runner
+"""
+Headless unhedged / forward / ATMF put evaluation from GlobalVariables config files.
+
+    python main.py base.json hedge_50.json --output-dir results
+    python main.py configs/*.toml --output-dir results --profile results/profile.json
+
+A config is a JSON or TOML mapping of GlobalVariables fields (unset fields keep their defaults), plus
+optional 'name' (output sub-directory, the file stem by default), 'cashflows' (CSV with a date index
+and a cf_eur column; cashflows_loader() by default) and 'strategies' (registered strategy names;
+all of DEFAULT_STRATEGIES by default).
+
+Configs sharing the market data file load it once; configs that also agree on every simulation input
+(dates, model, n_paths, seed, steps, cashflow dates) share one set of simulated paths, so e.g. hedge
+ratio, premium, rate or alpha variations only re-run the hedges and metrics.
+
+Per config, <output-dir>/<name>/ gets config.json (resolved fields), run.json (market inputs and premia),
+risk_summary.csv (risk_report per strategy and metric) and metrics.npz (per-path metric arrays).
+
+Imports are lazy: nothing heavier than argparse loads before the configs parse, matplotlib never
+loads, and scipy only loads when a config's strategies include 'option' (the put is priced).
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict, fields
+from pathlib import Path
+
+MARKET_FIELDS = ('market_data_path', 'cache_dir')
+PATH_FIELDS = MARKET_FIELDS + ('analysis_start_date', 'spot_rate_model', 'use_zero_mu', 'use_implied_sigma',
+                               'discretization_method', 'n_paths', 'seed', 'steps_per_year', 'chunk_size')
+DEFAULT_STRATEGIES = ('unhedged', 'forward', 'option')
+
+def load_config(
+        path: str
+):
+    """
+    (name, GlobalVariables, cashflows path or None, strategies) from a JSON / TOML config file.
+    """
+    import pandas as pd
+    from src.global_variables import GlobalVariables
+
+    path = Path(path)
+    if path.suffix.lower() == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            raw = tomllib.load(f)
+    else:
+        with open(path) as f:
+            raw = json.load(f)
+
+    name = str(raw.pop('name', path.stem))
+    cashflows = raw.pop('cashflows', None)
+    strategies = raw.pop('strategies', DEFAULT_STRATEGIES)
+    if isinstance(strategies, str) or not strategies:
+        raise ValueError(f'{path}: strategies must be a non-empty list of strategy names')
+    known = {f.name for f in fields(GlobalVariables)}
+    unknown = sorted(set(raw) - known)
+    if unknown:
+        raise ValueError(f'{path}: unknown GlobalVariables fields {unknown}')
+    if 'analysis_start_date' in raw:
+        raw['analysis_start_date'] = pd.Timestamp(raw['analysis_start_date'])
+    return name, GlobalVariables(**raw), cashflows, tuple(strategies)
+
+def _load_cashflows(
+        path
+):
+    import pandas as pd
+    from src.data_loader import cashflows_loader
+
+    if path is None:
+        return cashflows_loader()
+    df = pd.read_csv(path, index_col=0, parse_dates=True)[['cf_eur']]
+    df.index.rename('date', inplace=True)
+    return df.sort_index()
+
+def _market_inputs(
+        market_data,
+        global_variables
+) -> dict:
+    """
+    s0 (spot mid) and 1y / 5y ATM vols (ask, decimals) on the analysis date, mu / sigma from the spot history,
+    as in the notebook.
+    """
+    from src.data_loader import get_latest_quote, get_spot_prices
+    from src.fx_simulator import estimate_gbm_params
+
+    gv = global_variables
+    quote = lambda ticker, price: float(get_latest_quote(
+        market_data=market_data, price=price, analysis_start_date=gv.analysis_start_date, ticker=ticker).iloc[0])
+    vol_1y, vol_5y = quote('1y_atm_vol', 'ask'), quote('5y_atm_vol', 'ask')
+    mu, sigma = estimate_gbm_params(
+        spots=get_spot_prices(market_data=market_data, price='mid')[:gv.analysis_start_date],
+        steps_per_year=gv.steps_per_year,
+        use_zero_mu=gv.use_zero_mu)
+    return {
+        's0': quote('spot', 'mid'),
+        'mu': mu,
+        'sigma': sigma,
+        'vol_1y': vol_1y / 100.0 if vol_1y > 1.0 else vol_1y,
+        'vol_5y': vol_5y / 100.0 if vol_5y > 1.0 else vol_5y,
+    }
+
+def _simulate(
+        inputs: dict,
+        cashflows,
+        global_variables
+):
+    """
+    Spots at the cashflow dates for all n_paths, generated chunk by chunk as in src.engine (same seed, same paths).
+    Each chunk is copied into the preallocated result as it arrives, so only one chunk is alive beside it.
+    """
+    import numpy as np
+    from src.engine import iter_spot_chunks
+
+    gv = global_variables
+    if gv.spot_rate_model.upper() != 'GBM':
+        raise ValueError('The batch runner supports spot_rate_model="GBM".')
+
+    out = None
+    for paths, dates, spots in iter_spot_chunks(
+            s0=inputs['s0'], mu=inputs['mu'], sigma=inputs['sigma'], start=gv.analysis_start_date,
+            sample_dates=cashflows.index, n_paths=gv.n_paths, steps_per_year=gv.steps_per_year, seed=gv.seed,
+            chunk_size=gv.chunk_size, scheme=gv.discretization_method):
+        if out is None:
+            out = np.empty((gv.n_paths, spots.shape[1]), dtype=spots.dtype)
+        out[paths] = spots
+    return dates, out
+
+def evaluate_config(
+        spots,
+        path_dates,
+        cashflows,
+        inputs: dict,
+        global_variables,
+        strategies=DEFAULT_STRATEGIES
+) -> dict:
+    """
+    evaluate_strategies over the shared spots, chunk_size rows at a time; metrics concatenated per strategy.
+    """
+    import numpy as np
+    from src.schedule import Schedule
+    from src.strategies import METRICS, evaluate_strategies
+
+    gv = global_variables
+    schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=path_dates, s0=inputs['s0'], global_variables=gv)
+    parts = [
+        evaluate_strategies(
+            spot_samples=spots[row:row + gv.chunk_size], path_dates=path_dates, cashflows=cashflows,
+            s0=inputs['s0'], vol_1y=inputs['vol_1y'], vol_5y=inputs['vol_5y'], global_variables=gv,
+            strategies=strategies, schedule=schedule)
+        for row in range(0, spots.shape[0], gv.chunk_size)
+    ]
+    return {
+        name: {**parts[0][name], **{m: np.concatenate([p[name][m] for p in parts]) for m in METRICS}}
+        for name in parts[0]
+    }
+
+def write_results(
+        directory: Path,
+        config_fields: dict,
+        inputs: dict,
+        performance: dict,
+        global_variables
+) -> None:
+    import numpy as np
+    import pandas as pd
+    from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+    from src.strategies import METRICS
+
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'config.json', 'w') as f:
+        json.dump(config_fields, f, indent=2, default=str)
+
+    rows = []
+    for name, perf in performance.items():
+        for m in METRICS:
+            report = risk_report(perf[m], alpha=global_variables.alpha, loss_modes=(METRIC_LOSS_MODES[m],))[0]
+            rows.append({'strategy': name, 'metric': m, **report})
+    pd.DataFrame(rows).to_csv(directory / 'risk_summary.csv', index=False)
+
+    np.savez_compressed(directory / 'metrics.npz', **{f'{name}_{m}': perf[m] for name, perf in performance.items() for m in METRICS})
+    run = {**inputs, 'premium': {name: float(perf['premium']) for name, perf in performance.items()}}
+    with open(directory / 'run.json', 'w') as f:
+        json.dump(run, f, indent=2)
+
+def run(
+        config_paths: list[str],
+        output_dir: str
+) -> dict:
+    """
+    Runs every config, sharing market data and simulated paths where possible. Returns {name: output directory}.
+    """
+    from src.data_loader import market_data_loader
+
+    configs = [load_config(p) for p in config_paths]
+    names = [name for name, _, _, _ in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f'Config names must be unique, got {names}')
+
+    market_cache, path_cache, outputs = {}, {}, {}
+    for name, gv, cashflows_path, strategies in configs:
+        cashflows = _load_cashflows(cashflows_path)
+        market_key = tuple(getattr(gv, f) for f in MARKET_FIELDS)
+        if market_key not in market_cache:
+            market_cache[market_key] = market_data_loader(path=gv.market_data_path, cache_dir=gv.cache_dir)
+        market_data = market_cache[market_key]
+
+        path_key = tuple(str(getattr(gv, f)) for f in PATH_FIELDS) + (tuple(cashflows.index.astype(str)),)
+        if path_key not in path_cache:
+            inputs = _market_inputs(market_data, gv)
+            path_cache[path_key] = (inputs, *_simulate(inputs, cashflows, gv))
+        inputs, path_dates, spots = path_cache[path_key]
+
+        performance = evaluate_config(spots, path_dates, cashflows, inputs, gv, strategies)
+        directory = Path(output_dir) / name
+        write_results(directory, {'name': name, 'cashflows': cashflows_path, 'strategies': list(strategies), **asdict(gv)}, inputs, performance, gv)
+        outputs[name] = directory
+        print(f'{name}: {directory}', flush=True)
+    return outputs
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Batch FX hedge evaluation from GlobalVariables config files.')
+    parser.add_argument('configs', nargs='+', help='JSON or TOML config files')
+    parser.add_argument('--output-dir', default='results')
+    parser.add_argument('--profile', help='write a stage timing report (src.instrumentation) to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        from src.instrumentation import profile
+        with profile() as profiler:
+            run(args.configs, args.output_dir)
+        profiler.to_json(args.profile)
+    else:
+        run(args.configs, args.output_dir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# Adaptive Path Count Module
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from src.global_variables import GlobalVariables
+from src.engine import iter_performance_chunks
+from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+
+def _batch_means_error(
+        samples: np.ndarray,
+        loss: str,
+        alpha: float,
+        n_batches: int
+) -> tuple[dict, dict]:
+    """
+    risk_report statistics on all samples, and their standard errors from n_batches contiguous batches
+    (batch means: se = std(batch statistics) / sqrt(n_batches)). Valid for quantiles, VaR and ES as well as means.
+    """
+    full = risk_report(samples, alpha=alpha, loss_modes=(loss,))[0]
+    usable = samples[:samples.size - samples.size % n_batches]
+    batches = risk_report(usable.reshape(n_batches, -1).T, alpha=alpha, loss_modes=(loss,))
+    errors = {
+        stat: float(np.std([b[stat] for b in batches], ddof=1) / np.sqrt(n_batches))
+        for stat, value in full.items() if stat != 'n'
+    }
+    return full, errors
+
+def adaptive_run(
+        global_variables: GlobalVariables,
+        s0: float,
+        mu: float,
+        sigma: float,
+        cashflows: pd.DataFrame,
+        vol_1y: float,
+        vol_5y: float,
+        tolerances: dict,
+        max_paths: int = 2_000_000,
+        min_paths: int = 10_000,
+        n_batches: int = 20,
+        confidence: float = 0.95
+) -> dict:
+    """
+    Simulates chunk by chunk (global_variables.chunk_size paths) until every target is known to within its
+    tolerance, i.e. z * standard error <= tolerance at the given confidence, or max_paths is reached.
+
+    tolerances: {(strategy, metric, stat): tolerance}, stat being a risk_report key, e.g.
+        {('unhedged', 'npv', 'p05'): 10_000, ('option', 'npv', 'ES95_loss'): 10_000}
+
+    Paths are the same as a run_chunked run with the same seed (a prefix of it), so results are reproducible.
+    Returns the final estimates, their error half-widths, the path count used and whether all targets converged.
+    """
+    gv = replace(global_variables, n_paths=max_paths)
+    z = float(norm.ppf(0.5 + confidence / 2))
+    targets = {(strategy, metric) for strategy, metric, _ in tolerances}
+
+    samples = {target: [] for target in targets}
+    n_paths = 0
+    estimates, errors = {}, {}
+
+    for paths, performance in iter_performance_chunks(
+            global_variables=gv, s0=s0, mu=mu, sigma=sigma, cashflows=cashflows, vol_1y=vol_1y, vol_5y=vol_5y):
+        for strategy, metric in targets:
+            samples[strategy, metric].append(performance[strategy][metric])
+        n_paths = paths.stop
+
+        if n_paths < max(min_paths, 2 * n_batches) and n_paths < max_paths:
+            continue
+
+        reports = {}
+        for strategy, metric in targets:
+            x = np.concatenate(samples[strategy, metric])
+            samples[strategy, metric] = [x]
+            reports[strategy, metric] = _batch_means_error(x, METRIC_LOSS_MODES[metric], gv.alpha, n_batches)
+
+        estimates = {key: reports[key[:2]][0][key[2]] for key in tolerances}
+        errors = {key: z * reports[key[:2]][1][key[2]] for key in tolerances}
+        if all(errors[key] <= tol for key, tol in tolerances.items()):
+            break
+
+    return {
+        'n_paths': n_paths,
+        'converged': bool(errors) and all(errors[key] <= tol for key, tol in tolerances.items()),
+        'estimates': estimates,
+        'errors': errors,
+        'confidence': confidence,
+    }
@@ -0,0 +1,125 @@
+# Historical Backtest Module
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.hedges.options import _interpolate_atm_vol, garman_kohlhagen_price
+from src.metrics.performance import _yearfracs
+
+def rolling_gbm_params(
+        spots: pd.Series,
+        window: int,
+        steps_per_year: int,
+        use_zero_mu: bool = True
+) -> pd.DataFrame:
+    """
+    estimate_gbm_params over a rolling window of `window` log returns, for every date at once. Row i is
+    estimate_gbm_params(spots.iloc[i - window:i + 1]), i.e. what could have been calibrated on that date
+    (NaN until window returns are available).
+
+    Window sums come from cumulative sums of the returns and squared returns, centred on the full-sample
+    mean first so the variance difference does not cancel catastrophically.
+    """
+    if window < 2:
+        raise ValueError('window must be at least 2 returns.')
+    spots = spots.dropna().sort_index()
+    log_ret = np.diff(np.log(spots.to_numpy(dtype=float)))
+    dt = 1.0 / steps_per_year
+
+    centred = log_ret - log_ret.mean()
+    c1 = np.concatenate(([0.0], np.cumsum(centred)))
+    c2 = np.concatenate(([0.0], np.cumsum(centred ** 2)))
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+
+    var = np.maximum(s2 - s1 ** 2 / window, 0.0) / (window - 1)
+    sigma = np.sqrt(var / dt)
+    mu = np.zeros_like(sigma) if use_zero_mu else (s1 / window + log_ret.mean()) / dt + 0.5 * sigma ** 2
+
+    out = pd.DataFrame(np.nan, index=spots.index, columns=['mu', 'sigma'])
+    out.iloc[window:, 0] = mu
+    out.iloc[window:, 1] = sigma
+    return out
+
+def backtest_hedges(
+        market_data: pd.DataFrame,
+        cashflows: pd.DataFrame,
+        global_variables: GlobalVariables,
+        window: int = 252,
+        vol_source: Literal['implied', 'historical'] = 'implied'
+) -> dict:
+    """
+    Replays the loan from every historical start date in market_data: the cashflow schedule is shifted so that
+    global_variables.analysis_start_date lands on the start date (same calendar-day offsets), mu / sigma are
+    re-estimated on the trailing window, forwards and ATMF puts are priced with that day's spot and ATM vols
+    (ask, 1y / 5y interpolated; vol_source='historical' prices them at the rolling sigma instead) and the
+    hedged cashflows are realised against the actual spot mids (last quote on or before each date).
+
+    All start dates are handled as (n_starts, n_cashflows) arrays. Rates are the flat global_variables ones,
+    the market data having no rate history. Cashflows after the last quote are not realised (NaN), and NPV
+    (at discount_rate, from the start date) is only reported for fully realised schedules.
+
+    Returns:
+      - 'summary': DataFrame by start date with s0, mu, sigma, vols, premium, complete and, per strategy,
+        the realised USD total, hedge P&L (net of premium) and NPV,
+      - 'cashflows_usd': {strategy: DataFrame (start date x cashflow) of realised USD cashflows}.
+    """
+    gv = global_variables
+    spots = market_data['spot_mid'].dropna().sort_index()
+    params = rolling_gbm_params(
+        spots=spots, window=window, steps_per_year=gv.steps_per_year, use_zero_mu=gv.use_zero_mu).dropna()
+    starts = params.index
+
+    quotes = market_data[['1y_atm_vol_ask', '5y_atm_vol_ask']].sort_index().ffill().reindex(starts, method='pad')
+    quotes = quotes.to_numpy(dtype=float)
+    quotes = np.where(quotes > 1.0, quotes / 100.0, quotes)         # % to decimal, as in the notebook
+
+    # Same offsets (hence year fractions) from every start date
+    cashflow_eur = cashflows['cf_eur'].to_numpy(dtype=float)
+    offsets = pd.DatetimeIndex(cashflows.index) - gv.analysis_start_date
+    year_fractions = _yearfracs(start_date=gv.analysis_start_date, dates=cashflows.index)
+    discount_factors = (1 + gv.discount_rate) ** -year_fractions
+
+    s0 = spots.reindex(starts).to_numpy(dtype=float)[:, None]
+    dates = starts.to_numpy()[:, None] + offsets.to_numpy()[None, :]
+    realised = dates <= spots.index[-1].to_datetime64()
+    pos = spots.index.get_indexer(pd.DatetimeIndex(dates.ravel()), method='pad').reshape(dates.shape)
+    spot_T = np.where(realised, spots.to_numpy(dtype=float)[pos], np.nan)
+
+    hedged = cashflow_eur > 0
+    notional_eur = np.where(hedged, gv.hedging_ratio * cashflow_eur, 0.0)
+    forwards = s0 * np.exp((gv.r_domestic - gv.r_foreign) * year_fractions)
+    if vol_source == 'implied':
+        vols = _interpolate_atm_vol(tau=year_fractions, vol_1y=quotes[:, [0]], vol_5y=quotes[:, [1]])
+    elif vol_source == 'historical':
+        vols = np.broadcast_to(params[['sigma']].to_numpy(), forwards.shape)
+    else:
+        raise ValueError("vol_source must be one of: 'implied', 'historical'")
+    premium_per_eur = garman_kohlhagen_price(
+        s0=s0, K=forwards, r_domestic=gv.r_domestic, r_foreign=gv.r_foreign, tau=year_fractions, vol=vols, kind='put')
+    premium = (notional_eur * premium_per_eur).sum(axis=1)
+
+    unhedged = cashflow_eur * spot_T
+    hedges = {
+        'unhedged': np.zeros_like(spot_T),
+        'forward': notional_eur * (forwards - spot_T),
+        'option': notional_eur * np.maximum(forwards - spot_T, 0.0),
+    }
+    upfront = {'unhedged': 0.0, 'forward': 0.0, 'option': premium}
+
+    complete = realised.all(axis=1)
+    summary = pd.DataFrame({'s0': s0[:, 0], 'mu': params['mu'].to_numpy(), 'sigma': params['sigma'].to_numpy(),
+                            'vol_1y': quotes[:, 0], 'vol_5y': quotes[:, 1], 'premium': premium,
+                            'n_realised': realised.sum(axis=1), 'complete': complete}, index=starts)
+    cashflows_usd = {}
+    for name, hedge in hedges.items():
+        usd = unhedged + hedge
+        summary[f'{name}_usd'] = np.nansum(usd, axis=1) - upfront[name]
+        summary[f'{name}_hedge_pnl'] = np.nansum(hedge, axis=1) - upfront[name]
+        summary[f'{name}_npv'] = np.where(complete, np.nan_to_num(usd) @ discount_factors - upfront[name], np.nan)
+        cashflows_usd[name] = pd.DataFrame(usd, index=starts, columns=offsets.days.rename('offset_days'))
+
+    summary.index.rename('start_date', inplace=True)
+    return {'summary': summary, 'cashflows_usd': cashflows_usd}
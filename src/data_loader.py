@@ -1,10 +1,17 @@
 # Data Loader Module
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
 from typing import Optional
 import warnings
 
 import numpy as np
 import pandas as pd
 
+from src.instrumentation import instrument
+
 def _clean_level_one_col(
         column: str
 ) -> str:
@@ -27,7 +34,7 @@ def _clean_level_two_col(
         col = col.replace('px_', '')
         return col
         
-def market_data_loader(
+def _read_market_data_excel(
         path: str,
         sheet_name: Optional[str] = 'Sheet1'
 ) -> pd.DataFrame:
@@ -48,6 +55,108 @@ def market_data_loader(
         df = df.dropna(subset=[f'spot_mid'])
         return df
 
+_CACHE_VERSION = 1
+
+def _file_sha256(
+        path: str
+) -> str:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                        h.update(block)
+        return h.hexdigest()
+
+def _atomic_save(
+        target: Path,
+        write
+) -> None:
+        """
+        Writes target via a uniquely named temporary file in the same directory, then renames it into place,
+        so concurrent writers never share (or publish each other's half-written) temporary files.
+        """
+        with tempfile.NamedTemporaryFile(dir=target.parent, prefix=target.name + '.', suffix='.tmp', delete=False) as f:
+                tmp = Path(f.name)
+                try:
+                        write(f)
+                except BaseException:
+                        f.close()
+                        tmp.unlink(missing_ok=True)
+                        raise
+        os.replace(tmp, target)
+
+def _cached_market_data(
+        path: str,
+        sheet_name: Optional[str],
+        cache_dir: str
+) -> pd.DataFrame:
+        """
+        Columnar cache of the cleaned market data: values (float64 matrix) and index as .npy, reopened
+        memory-mapped copy-on-write (writable, the cache file is never modified), plus a JSON entry with the
+        column names and the source's mtime, size and sha256. Entries are keyed by the resolved source path
+        and sheet name.
+        An unchanged mtime/size is trusted; otherwise the file is re-hashed and only re-parsed if its
+        content changed.
+        """
+        source = Path(path).resolve()
+        stat = source.stat()
+        source_id = hashlib.sha256(str(source).encode()).hexdigest()[:16]
+        stem = Path(cache_dir) / f'{source.stem}.{sheet_name}.{source_id}'
+        meta_path = stem.with_name(stem.name + '.meta.json')
+        values_path = stem.with_name(stem.name + '.values.npy')
+        index_path = stem.with_name(stem.name + '.index.npy')
+
+        meta = None
+        if meta_path.exists() and values_path.exists() and index_path.exists():
+                meta = json.loads(meta_path.read_text())
+                if meta.get('version') != _CACHE_VERSION:
+                        meta = None
+
+        if meta is not None and (meta['mtime_ns'], meta['size']) != (stat.st_mtime_ns, stat.st_size):
+                if meta['sha256'] == _file_sha256(path):
+                        # Touched but unchanged
+                        meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                        _atomic_save(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+                else:
+                        meta = None
+
+        if meta is None:
+                df = _read_market_data_excel(path=path, sheet_name=sheet_name)
+                stem.parent.mkdir(parents=True, exist_ok=True)
+                _atomic_save(values_path, lambda f: np.save(f, df.to_numpy(dtype=float)))
+                _atomic_save(index_path, lambda f: np.save(f, df.index.to_numpy()))
+                meta = {
+                        'version': _CACHE_VERSION,
+                        'source': str(source),
+                        'sheet_name': sheet_name,
+                        'mtime_ns': stat.st_mtime_ns,
+                        'size': stat.st_size,
+                        'sha256': _file_sha256(path),
+                        'columns': list(df.columns),
+                        'index_name': df.index.name,
+                }
+                _atomic_save(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+                return df
+
+        values = np.load(values_path, mmap_mode='c')
+        index = pd.DatetimeIndex(np.load(index_path), name=meta['index_name'])
+        return pd.DataFrame(values, index=index, columns=meta['columns'], copy=False)
+
+@instrument('load.market_data')
+def market_data_loader(
+        path: str,
+        sheet_name: Optional[str] = 'Sheet1',
+        cache_dir: Optional[str] = None
+) -> pd.DataFrame:
+        """
+        Loads and cleans the EURUSD market data workbook.
+        If cache_dir is given, the cleaned frame is cached there (see _cached_market_data) and reloaded
+        memory-mapped on later runs until the workbook changes.
+        """
+        if cache_dir is not None:
+                return _cached_market_data(path=path, sheet_name=sheet_name, cache_dir=cache_dir)
+        return _read_market_data_excel(path=path, sheet_name=sheet_name)
+
+@instrument('load.cashflows')
 def cashflows_loader(
         *,
         premium_usd: Optional[float] = None,
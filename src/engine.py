@@ -0,0 +1,217 @@
+# Monte Carlo Engine Module
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.fx_simulator import _sample_index, simulate_gbm_paths
+from src.schedule import Schedule
+from src.strategies import METRICS, evaluate_strategies
+
+STRATEGIES = ('unhedged', 'forward', 'option')
+
+BLOCK_SIZE = 4096                     # Paths per SeedSequence child. Part of the random stream: changing it changes results.
+
+def _block_seed(
+        root: np.random.SeedSequence,
+        block: int
+) -> np.random.SeedSequence:
+    """
+    Child `block` of root, identical to root.spawn(block + 1)[block] but without spawning (and mutating root).
+    """
+    return np.random.SeedSequence(
+        entropy=root.entropy,
+        spawn_key=root.spawn_key + (block,),
+        pool_size=root.pool_size)
+
+def block_normals(
+        n_paths: int,
+        n_columns: int,
+        seed: Optional[int] = None,
+        block_size: int = BLOCK_SIZE
+) -> np.ndarray:
+    """
+    (n_paths, n_columns) standard normals behind iter_spot_chunks' exact scheme for the same seed and block_size:
+    path p is row p // block_size of its block's stream. Rebuilding exact GBM from them gives that run's spots.
+    """
+    root = np.random.SeedSequence(seed)
+    z = np.empty((n_paths, n_columns))
+    for block, row in enumerate(range(0, n_paths, block_size)):
+        rng = np.random.default_rng(_block_seed(root, block))
+        z[row:row + block_size] = rng.standard_normal(size=(min(block_size, n_paths - row), n_columns))
+    return z
+
+def iter_spot_chunks(
+        s0: float,
+        mu: float,
+        sigma: float,
+        start: pd.Timestamp,
+        sample_dates: pd.DatetimeIndex,
+        n_paths: int,
+        steps_per_year: int,
+        seed: Optional[int] = None,
+        chunk_size: int = 25000,
+        block_size: int = BLOCK_SIZE,
+        paths: Optional[slice] = None,
+        scheme: str = 'exact'
+) -> Iterator[tuple[slice, pd.DatetimeIndex, np.ndarray]]:
+    """
+    Yields (paths, dates, spots) for consecutive chunks of at most chunk_size paths, sampled on sample_dates only.
+    paths is the slice of global path numbers held by the chunk. Pass paths=slice(start, stop) to generate only
+    that range of the n_paths (e.g. one shard of a parallel run); it matches the same rows of a full run.
+
+    Path p always draws from block p // block_size, each block having its own SeedSequence child of seed.
+    A block's Generator is carried across chunk boundaries, so a given seed (and block_size) gives the same
+    paths whatever the chunk size.
+
+    scheme: simulate_gbm_paths scheme. 'em' / 'milstein' draw step by step across all of a block's paths, so
+    each block is simulated whole and sliced, keeping the same chunk size independence. Blocks stop at n_paths:
+    block b holds min(block_size, n_paths - b * block_size) paths, so em / milstein paths depend on n_paths
+    through the last block (and a shard simulates at most its first and last blocks beyond its own rows).
+    """
+    if n_paths <= 0:
+        raise ValueError('n_paths muse be non-negative.')
+    if chunk_size <= 0 or block_size <= 0:
+        raise ValueError('chunk_size and block_size must be positive.')
+    scheme = scheme.lower()
+    if scheme not in ('exact', 'em', 'milstein'):
+        raise ValueError(f'scheme must be "exact", "em" or "milstein", got {scheme!r}.')
+
+    first, last, _ = (paths or slice(0, n_paths)).indices(n_paths)
+    end = pd.DatetimeIndex(sample_dates).max()
+    n_columns = _sample_index(dates=pd.bdate_range(start=start, end=end), sample_dates=sample_dates).size
+    root = np.random.SeedSequence(seed)
+    block, rng, block_spots = -1, None, None
+    simulate = lambda rows, seed: simulate_gbm_paths(
+        s0=s0, mu=mu, sigma=sigma, start=start, end=end, n_paths=rows, steps_per_year=steps_per_year,
+        seed=seed, scheme=scheme, sample_dates=sample_dates)
+
+    for chunk_start in range(first, last, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, last)
+        pieces = []
+
+        row = chunk_start
+        while row < chunk_stop:
+            if row // block_size != block:
+                block = row // block_size
+                if scheme == 'exact':
+                    rng = np.random.default_rng(_block_seed(root, block))
+                    skip = row - block * block_size
+                    if skip:
+                        # Range starts mid-block: burn the block's earlier rows to stay on its stream
+                        rng.standard_normal(size=(skip, n_columns))
+                else:
+                    dates, block_spots = simulate(min(block_size, n_paths - block * block_size), _block_seed(root, block))
+            rows = min(chunk_stop, (block + 1) * block_size) - row
+
+            if scheme == 'exact':
+                dates, spots = simulate(rows, rng)
+            else:
+                spots = block_spots[row - block * block_size:row - block * block_size + rows]
+            pieces.append(spots)
+            row += rows
+
+        yield slice(chunk_start, chunk_stop), dates, pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+
+def evaluate_chunk(
+        spots: np.ndarray,
+        path_dates: pd.DatetimeIndex,
+        cashflows: pd.DataFrame,
+        s0: float,
+        vol_1y: float,
+        vol_5y: float,
+        global_variables: GlobalVariables,
+        schedule: Optional[Schedule] = None
+) -> dict:
+    """
+    Unhedged, forward and ATMF put performance for a chunk of spot paths (full grid or sample_dates columns).
+    Returns one performance dict per strategy, keyed like the notebook's performance_* dicts.
+    """
+    return evaluate_strategies(
+        spot_samples=spots,
+        path_dates=path_dates,
+        cashflows=cashflows,
+        s0=s0,
+        vol_1y=vol_1y,
+        vol_5y=vol_5y,
+        global_variables=global_variables,
+        strategies=STRATEGIES,
+        schedule=schedule)
+
+def iter_performance_chunks(
+        global_variables: GlobalVariables,
+        s0: float,
+        mu: float,
+        sigma: float,
+        cashflows: pd.DataFrame,
+        vol_1y: float,
+        vol_5y: float,
+        paths: Optional[slice] = None
+) -> Iterator[tuple[slice, dict]]:
+    """
+    Streaming pipeline: simulate -> hedge -> metrics, one chunk of global_variables.chunk_size paths at a time.
+    Only the cashflow-date columns are simulated, so peak memory is set by chunk_size, not n_paths.
+    Paths follow global_variables.discretization_method.
+    paths restricts the run to a range of global path numbers (see iter_spot_chunks).
+    """
+    gv = global_variables
+    chunks = iter_spot_chunks(
+        s0=s0,
+        mu=mu,
+        sigma=sigma,
+        start=gv.analysis_start_date,
+        sample_dates=pd.DatetimeIndex(cashflows.index),
+        n_paths=gv.n_paths,
+        steps_per_year=gv.steps_per_year,
+        seed=gv.seed,
+        chunk_size=gv.chunk_size,
+        paths=paths,
+        scheme=gv.discretization_method)
+
+    schedule = None
+    for paths, dates, spots in chunks:
+        if schedule is None:
+            # Every chunk shares the sampled calendar: date work done once per run
+            schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=dates, s0=s0, global_variables=gv)
+        yield paths, evaluate_chunk(
+            spots=spots,
+            path_dates=dates,
+            cashflows=cashflows,
+            s0=s0,
+            vol_1y=vol_1y,
+            vol_5y=vol_5y,
+            global_variables=gv,
+            schedule=schedule)
+
+def run_chunked(
+        global_variables: GlobalVariables,
+        s0: float,
+        mu: float,
+        sigma: float,
+        cashflows: pd.DataFrame,
+        vol_1y: float,
+        vol_5y: float
+) -> dict:
+    """
+    Runs iter_performance_chunks and gathers the per-path metrics into (n_paths,) arrays per strategy.
+    Only the metric arrays grow with n_paths; consume iter_performance_chunks directly to avoid even that.
+    """
+    n_paths = global_variables.n_paths
+    out = {}
+
+    for paths, performance in iter_performance_chunks(
+            global_variables=global_variables,
+            s0=s0,
+            mu=mu,
+            sigma=sigma,
+            cashflows=cashflows,
+            vol_1y=vol_1y,
+            vol_5y=vol_5y):
+        for strategy, results in performance.items():
+            if strategy not in out:
+                out[strategy] = {**results, **{m: np.empty(n_paths, dtype=float) for m in METRICS}}
+            for m in METRICS:
+                out[strategy][m][paths] = results[m]
+
+    return out
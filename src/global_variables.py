@@ -2,6 +2,8 @@
 # Clean, Dataiku-style dataclass instead of JSON TOML
 
 from dataclasses import dataclass, fields
+from typing import Optional
+
 import pandas as pd
 
 @dataclass(frozen=True)
@@ -9,6 +11,7 @@ class GlobalVariables:
 
     # Data
     market_data_path: str = 'QuantResearch-CaseStudy-MarketData-25.xlsx'
+    cache_dir: Optional[str] = '.cache'         # Market data cache (None to always re-parse the workbook)
     discount_rate: float = 0.05
 
     r_domestic: float = 0.0439 # SOFR as of 2025-08-01
@@ -23,10 +26,12 @@ class GlobalVariables:
     use_implied_sigma: bool = False
 
     # Discretisation
-    discretization_method: str = 'exact'          # TODO: tractable, no need for em or milstein
+    discretization_method: str = 'exact'          # Closed-form GBM; 'em' / 'milstein' step the SDE (simulate_sde_paths), used by src.engine
 
     # Simulations
     n_paths: int = 50000
+    seed: Optional[int] = None
+    chunk_size: int = 25000                    # Paths per chunk in src.engine (bounds peak memory)
     steps_per_year: int = 252                  # Historical data has 260-262 spot samples per year.
                                                # We use business days for ease (bdate_range)
     
@@ -1,8 +1,14 @@
 # Hedges/Forwards
+from typing import TYPE_CHECKING, Optional
+
 import numpy as np
 import pandas as pd
 
 from src.metrics.performance import _yearfrac
+from src.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from src.schedule import Schedule
 
 def _forward_rates(
     s0: float,
@@ -26,6 +32,7 @@ def _forward_rates(
 
     return forwards
 
+@instrument('hedge.forward')
 def forward_hedge_cashflows_usd(
         spot_paths: np.ndarray,
         path_dates: np.ndarray,
@@ -37,24 +44,30 @@ def forward_hedge_cashflows_usd(
         hedge_ratio: float = 1.0,
         #n_paths: int,
         #n_steps: int,
-        start_date: pd.Timestamp =  pd.Timestamp('2025-08-01')
+        start_date: pd.Timestamp =  pd.Timestamp('2025-08-01'),
+        schedule: Optional['Schedule'] = None
 ) -> tuple[np.ndarray, np.ndarray]:
     """
     Uses Forward rates calculated at start_date ('2025-08-01' by default).
     Opted for returning payoffs along with forward rate used. i.e. payoff_i = CF_i x (F(0, T_i). - S_{T_i}).
     This only calculates forward rates for the positive cashdlows (i.e. the inital outflow isn't covered.)
+    schedule: precomputed forwards and grid indices (built from the same s0, rates and calendar).
     """
-    forwards = _forward_rates(
-        s0=s0,
-        start_date=start_date,
-        cashflow_dates=np.asarray(cashflow_dates),
-        r_domestic=r_domestic,
-        r_foreign=r_foreign)
+    if schedule is not None:
+        forwards = np.array(schedule.forwards)
+        cashflow_dates_idx = schedule.grid_idx
+    else:
+        forwards = _forward_rates(
+            s0=s0,
+            start_date=start_date,
+            cashflow_dates=np.asarray(cashflow_dates),
+            r_domestic=r_domestic,
+            r_foreign=r_foreign)
+        cashflow_dates_idx = path_dates.get_indexer(cashflow_dates, method='pad')
 
     n_paths, n_steps = spot_paths.shape
     n_cashflows = cashflow_eur.size
 
-    cashflow_dates_idx = path_dates.get_indexer(cashflow_dates, method='pad')
     hedge_cashflows_usd = np.zeros((n_paths, n_cashflows), dtype=float)
 
 
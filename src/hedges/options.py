@@ -1,26 +1,112 @@
 # Hedges/Options
 
+from typing import TYPE_CHECKING, Optional
+
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 
-from src.metrics.performance import _yearfrac
+from src.metrics.performance import _yearfracs
 from src.hedges.forwards import _forward_rates
+from src.instrumentation import instrument
+
+if TYPE_CHECKING:
+    from src.hedges.vol_surface import VolSurface
+    from src.schedule import Schedule
 
 def _interpolate_atm_vol(
-    tau: float,
+    tau: float | np.ndarray,
     vol_1y: float,
     vol_5y: float,
-) -> float:
+) -> float | np.ndarray:
+    """
+    Inerpolates ATM VOL for date between 1Y and 5Y (flat outside). Works on scalars and arrays of tau.
+    """
+    w = np.clip((np.asarray(tau, dtype=float) - 1.0) / (5.0 - 1.0), 0.0, 1.0)
+    vol = (1.0 - w) * vol_1y + w * vol_5y
+    return float(vol) if np.ndim(vol) == 0 else vol
+
+def _d1_d2(
+    forward: np.ndarray,
+    K: np.ndarray,
+    tau: np.ndarray,
+    vol: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    d1, d2 on the forward. With zero vol (or tau) they go to +-inf (0 at the money), i.e. the deterministic limit.
+    """
+    log_fk = np.log(forward / K)
+    vol_sqrt_t = vol * np.sqrt(np.maximum(tau, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (log_fk + 0.5 * vol * vol_sqrt_t * np.sqrt(np.maximum(tau, 0.0))) / vol_sqrt_t
+    d1 = np.where(vol_sqrt_t > 0.0, d1, np.where(log_fk > 0.0, np.inf, np.where(log_fk < 0.0, -np.inf, 0.0)))
+    return d1, d1 - vol_sqrt_t
+
+def garman_kohlhagen_greeks(
+    s0: float | np.ndarray,
+    K: float | np.ndarray,
+    r_domestic: float | np.ndarray,
+    r_foreign: float | np.ndarray,
+    tau: float | np.ndarray,
+    vol: float | np.ndarray,
+    kind: str = 'put',
+) -> dict:
     """
-    Inerpolates ATM VOL for date between 1Y and 5Y
+    Garman and Kohlhagen price and Greeks, vectorised: all inputs broadcast against each other, e.g.
+    spots (n_paths, 1) against strikes/tenors (n_cashflows,). USD per unit of EUR notional.
+
+    delta: dV/dS (spot delta), gamma: d2V/dS2, vega: dV/dvol (per 1.00 of vol), theta: dV/dt (per year).
+    tau <= 0 gives intrinsic value on spot (as _garman_kohlhagen_put) with zero gamma/vega/theta.
+    """
+    from scipy.stats import norm                     # Lazy: scipy is only needed once options are priced
+
+    if kind not in ('put', 'call'):
+        raise ValueError("kind must be 'put' or 'call'")
+    phi = 1.0 if kind == 'call' else -1.0
+
+    s0, K, r_d, r_f, tau, vol = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (s0, K, r_domestic, r_foreign, tau, vol)))
+    alive = tau > 0.0
+    t = np.where(alive, tau, 0.0)
+
+    df_d = np.exp(-r_d * t)
+    df_f = np.exp(-r_f * t)
+    forward = s0 * df_f / df_d
+    d1, d2 = _d1_d2(forward=forward, K=K, tau=t, vol=vol)
+    pdf_d1 = norm.pdf(d1)
+    sqrt_t = np.sqrt(t)
+
+    price = phi * (s0 * df_f * norm.cdf(phi * d1) - K * df_d * norm.cdf(phi * d2))
+    delta = phi * df_f * norm.cdf(phi * d1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = np.where(vol * sqrt_t > 0.0, df_f * pdf_d1 / (s0 * vol * sqrt_t), 0.0)
+        decay = np.where(sqrt_t > 0.0, -s0 * df_f * pdf_d1 * vol / (2.0 * sqrt_t), 0.0)
+    vega = s0 * df_f * pdf_d1 * sqrt_t
+    theta = decay + phi * (r_f * s0 * df_f * norm.cdf(phi * d1) - r_d * K * df_d * norm.cdf(phi * d2))
+
+    # Expired: intrinsic on spot
+    intrinsic = np.maximum(phi * (s0 - K), 0.0)
+    itm = phi * (s0 - K) > 0.0
+    return {
+        'price': np.where(alive, price, intrinsic),
+        'delta': np.where(alive, delta, np.where(itm, phi, 0.0)),
+        'gamma': np.where(alive, gamma, 0.0),
+        'vega': np.where(alive, vega, 0.0),
+        'theta': np.where(alive, theta, 0.0),
+    }
+
+def garman_kohlhagen_price(
+    s0: float | np.ndarray,
+    K: float | np.ndarray,
+    r_domestic: float | np.ndarray,
+    r_foreign: float | np.ndarray,
+    tau: float | np.ndarray,
+    vol: float | np.ndarray,
+    kind: str = 'put',
+) -> np.ndarray:
     """
-    if tau <= 1.0:
-        return float(vol_1y)
-    if tau >= 5.0:
-        return float(vol_5y)
-    w = (tau - 1.0) / (5.0 - 1.0)
-    return float((1.0 - w) * vol_1y + w * vol_5y)
+    Vectorised Garman and Kohlhagen put/call price (see garman_kohlhagen_greeks for conventions).
+    """
+    return garman_kohlhagen_greeks(
+        s0=s0, K=K, r_domestic=r_domestic, r_foreign=r_foreign, tau=tau, vol=vol, kind=kind)['price']
 
 def _garman_kohlhagen_put(
     s0: float,
@@ -32,25 +118,13 @@ def _garman_kohlhagen_put(
 ) -> float:
     """
     FX Put Option
-    Garman and Kohlhagen Black Scholes adaptation to FX Options.
+    Garman and Kohlhagen Black Scholes adaptation to FX Options. Scalar wrapper of garman_kohlhagen_price.
     """
-    if tau <= 0.0:
-        return float(max(K - s0, 0.0))
-
-    forward = s0 * np.exp((r_domestic - r_foreign) * tau)
-    df_d = np.exp(-r_domestic * tau)
-
-    if vol <= 0.0:
-        return float(df_d * max(K - forward, 0.0))
-
-    sqrt_t = np.sqrt(tau)
-    d1 = (np.log(forward / K) + 0.5 * vol * vol * tau) / (vol * sqrt_t)
-    d2 = d1 - vol * sqrt_t
-
-    put_price = df_d * (K * norm.cdf(-d2) - forward * norm.cdf(-d1))
-    return float(put_price)
+    return float(garman_kohlhagen_price(
+        s0=s0, K=K, r_domestic=r_domestic, r_foreign=r_foreign, tau=tau, vol=vol, kind='put'))
 
 
+@instrument('hedge.put')
 def put_option_hedge_cashflows_usd(
     spot_paths: np.ndarray,
     path_dates: np.ndarray,
@@ -65,64 +139,67 @@ def put_option_hedge_cashflows_usd(
     vol_5y: float,
     hedge_ratio: float,
     start_date: pd.Timestamp = pd.Timestamp('2025-08-01'),
+    moneyness: float = 1.0,
+    schedule: Optional['Schedule'] = None,
+    vol_surface: Optional['VolSurface'] = None,
 ) -> tuple[np.ndarray, float, np.ndarray, np.ndarray]:
     """
     ATMF put hedge (EUR pur / US) for cashflows using interpolated atm vols
     premium payed at start_date
+    moneyness scales the strikes off the forward, K = moneyness x F(0, T) (1.0 = ATMF).
+    schedule: precomputed year fractions, forwards and grid indices (built from the same s0, rates and calendar).
+    vol_surface: if given, each strike is priced at its smile vol instead of the interpolated ATM vol.
     """ 
     n_paths, n_steps = spot_paths.shape
     n_cashflows = cashflow_eur.size
 
-    path_dates = pd.DatetimeIndex(path_dates)
-    cashflow_dates_idx = path_dates.get_indexer(cashflow_dates, method='pad')
+    if schedule is not None:
+        cashflow_dates_idx = schedule.grid_idx
+        year_fractions = schedule.year_fractions
+        forwards = schedule.forwards
+    else:
+        path_dates = pd.DatetimeIndex(path_dates)
+        cashflow_dates_idx = path_dates.get_indexer(cashflow_dates, method='pad')
 
-    # TODO: WARNING TO CHECK DATES WITHING PERIOD
+        # TODO: WARNING TO CHECK DATES WITHING PERIOD
 
-    # Forward Rates and ATMF Strike
-    year_fractions = np.array([_yearfrac(start_date=pd.Timestamp(start_date), end_date=date) for date in cashflow_dates], dtype=float)
-    forwards = _forward_rates(
-        s0=s0,
-        cashflow_dates=np.asarray(cashflow_dates),
-        r_domestic=r_domestic,
-        r_foreign=r_foreign,
-        start_date=pd.Timestamp(start_date)
-    )
-    strikes = np.full(n_cashflows, np.nan, dtype=float)
-    vols_used = np.full(n_cashflows, np.nan, dtype=float)
-    hedge_cashflow_usd = np.zeros((n_paths, n_cashflows), dtype=float)
-    premium = 0.0
-
-    for i in range(n_cashflows):
-        cf_eur = cashflow_eur[i]
-
-        if cf_eur <= 0:
-            continue
-
-        notional_eur = hedge_ratio * cf_eur
-        
-        tau = float(year_fractions[i])
-        
-        sigma = _interpolate_atm_vol(tau=tau, vol_1y=vol_1y, vol_5y=vol_5y)
-        K = float(forwards[i])
-        
-        strikes[i] = K # <--- ATMF Strikes
-        vols_used[i] = sigma
-
-        # Premium per eur_notional in USD 
-        premium_per_eur = _garman_kohlhagen_put(
+        # Forward Rates and ATMF Strike
+        year_fractions = _yearfracs(start_date=start_date, dates=cashflow_dates)
+        forwards = _forward_rates(
             s0=s0,
-            K=K,
-            tau=tau,
+            cashflow_dates=np.asarray(cashflow_dates),
             r_domestic=r_domestic,
             r_foreign=r_foreign,
-            vol=float(sigma)
+            start_date=pd.Timestamp(start_date)
         )
-        premium += notional_eur * premium_per_eur
+    strikes = np.full(n_cashflows, np.nan, dtype=float)
+    vols_used = np.full(n_cashflows, np.nan, dtype=float)
+    hedge_cashflow_usd = np.zeros((n_paths, n_cashflows), dtype=float)
+
+    # Only the positive (incoming) cashflows are hedged
+    hedged = cashflow_eur > 0
+    notional_eur = np.where(hedged, hedge_ratio * cashflow_eur, 0.0)
 
-        spots_i = spot_paths[:, cashflow_dates_idx[i]]
-        
-        payoffs_i = notional_eur * np.maximum(K - spots_i, 0.0)
+    strikes[hedged] = moneyness * forwards[hedged] # <--- ATMF Strikes (moneyness = 1)
+    if vol_surface is not None:
+        vols = vol_surface.vol_at_strike(tau=year_fractions, strike=moneyness * forwards, forward=forwards)
+    else:
+        vols = _interpolate_atm_vol(tau=year_fractions, vol_1y=vol_1y, vol_5y=vol_5y)
+    vols_used[hedged] = vols[hedged]
+
+    # Premium per eur_notional in USD
+    premium_per_eur = garman_kohlhagen_price(
+        s0=s0,
+        K=strikes[hedged],
+        tau=year_fractions[hedged],
+        r_domestic=r_domestic,
+        r_foreign=r_foreign,
+        vol=vols[hedged],
+        kind='put'
+    )
+    premium = float(np.sum(notional_eur[hedged] * premium_per_eur))
 
-        hedge_cashflow_usd[:, i] = payoffs_i
+    spots = spot_paths[:, cashflow_dates_idx[hedged]]
+    hedge_cashflow_usd[:, hedged] = notional_eur[hedged] * np.maximum(strikes[hedged] - spots, 0.0)
 
     return hedge_cashflow_usd, float(premium), strikes, vols_used
\ No newline at end of file
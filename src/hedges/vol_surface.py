@@ -0,0 +1,109 @@
+# Hedges/Vol Surface
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+@dataclass(frozen=True)
+class VolSurface:
+    """
+    EURUSD implied vol smile per tenor from ATM, 25-delta risk reversal and 25-delta butterfly quotes
+    (decimals). Each smile is the quadratic in forward call delta through the 25-delta call (delta 0.25),
+    ATM and 25-delta put (call delta 0.75) vols, with sigma_25C/P = ATM + BF +- RR / 2 (smile strangle
+    approximation). The ATM vol sits at the ATMF strike, as the rest of the pipeline prices ATMF puts at it,
+    i.e. at call delta delta_0 = N(ATM sqrt(tau) / 2) (0.5 as tau -> 0, where the smile reduces to
+    ATM - 2 RR (delta - 0.5) + 16 BF (delta - 0.5)^2), so vol_at_strike(tau, F, F) returns the ATM vol.
+
+    ATM, RR and BF are interpolated linearly in tenor and flat outside the quoted tenors, as _interpolate_atm_vol.
+    Build it once per market date; every lookup is vectorised and broadcasts its inputs.
+    """
+    date: pd.Timestamp
+    tenors: np.ndarray
+    atm: np.ndarray
+    risk_reversal: np.ndarray
+    butterfly: np.ndarray
+
+    @classmethod
+    def from_market_data(
+            cls,
+            market_data: pd.DataFrame,
+            date: Optional[pd.Timestamp] = None,
+            price: str = 'ask'
+    ) -> 'VolSurface':
+        """
+        From market_data_loader output, using the latest quotes on or before date (latest overall by default).
+        Quotes in vol percent (as in the workbook) are converted to decimals. Ask quotes by default, as the
+        puts are priced off the ask ATM vols elsewhere.
+        """
+        df = market_data.sort_index()
+        if date is not None:
+            df = df[:date]
+        if df.empty:
+            raise ValueError(f'No market data on or before {date}')
+        quotes = df.ffill().iloc[-1]
+
+        tenors = np.array([1.0, 5.0])
+        columns = {name: [f'{int(t)}y_{name}_{price}' for t in tenors] for name in ('atm_vol', '25_risk_reversal', '25_bf')}
+        values = {name: quotes[cols].to_numpy(dtype=float) for name, cols in columns.items()}
+        scale = 0.01 if (values['atm_vol'] > 1.0).any() else 1.0      # % to decimal, as in the notebook
+
+        return cls(
+            date=pd.Timestamp(quotes.name),
+            tenors=tenors,
+            atm=values['atm_vol'] * scale,
+            risk_reversal=values['25_risk_reversal'] * scale,
+            butterfly=values['25_bf'] * scale)
+
+    def _smile(
+            self,
+            tau: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tau = np.asarray(tau, dtype=float)
+        return tuple(np.interp(tau, self.tenors, quotes) for quotes in (self.atm, self.risk_reversal, self.butterfly))
+
+    def atm_vol(
+            self,
+            tau: float | np.ndarray
+    ) -> np.ndarray:
+        return self._smile(tau)[0]
+
+    def vol_at_delta(
+            self,
+            tau: float | np.ndarray,
+            delta: float | np.ndarray
+    ) -> np.ndarray:
+        """
+        Vol at forward call delta N(d1) in (0, 1); for a put delta pass 1 + delta (e.g. 25-delta put: 0.75).
+        """
+        atm, rr, bf = self._smile(tau)
+        d0 = norm.cdf(0.5 * atm * np.sqrt(np.maximum(np.asarray(tau, dtype=float), 0.0)))
+        x = np.asarray(delta, dtype=float)
+        call_25, put_25 = atm + bf + 0.5 * rr, atm + bf - 0.5 * rr
+        # Lagrange quadratic through (0.25, sigma_25C), (d0, ATM), (0.75, sigma_25P)
+        vol = (call_25 * (x - d0) * (x - 0.75) / ((0.25 - d0) * (0.25 - 0.75))
+               + atm * (x - 0.25) * (x - 0.75) / ((d0 - 0.25) * (d0 - 0.75))
+               + put_25 * (x - 0.25) * (x - d0) / ((0.75 - 0.25) * (0.75 - d0)))
+        return np.maximum(vol, 1e-4)
+
+    def vol_at_strike(
+            self,
+            tau: float | np.ndarray,
+            strike: float | np.ndarray,
+            forward: float | np.ndarray,
+            n_iter: int = 8
+    ) -> np.ndarray:
+        """
+        Vol at strike for forward, solving delta = N(d1(strike, vol(delta))) by fixed-point iteration
+        from the ATM vol (a handful of iterations converges for quoted smiles). tau <= 0 gives the ATM vol.
+        """
+        tau, strike, forward = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (tau, strike, forward)))
+        sqrt_t = np.sqrt(np.maximum(tau, 0.0))
+        log_fk = np.log(forward / strike)
+        vol = self.atm_vol(tau)
+        for _ in range(n_iter):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                d1 = (log_fk + 0.5 * vol ** 2 * tau) / (vol * sqrt_t)
+            vol = np.where(sqrt_t > 0.0, self.vol_at_delta(tau, norm.cdf(d1)), vol)
+        return vol
@@ -0,0 +1,218 @@
+# Incremental Daily Re-run Module
+import hashlib
+import pickle
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.data_loader import get_latest_quote, get_spot_prices
+from src.engine import block_normals
+from src.fx_simulator import _sample_index
+from src.schedule import Schedule
+from src.strategies import METRICS, evaluate_strategies
+
+# What each strategy's metrics depend on besides the simulated spots
+STRATEGY_INPUTS = {'unhedged': (), 'forward': (), 'option': ('vol_1y', 'vol_5y')}
+SPOT_INPUTS = ('analysis_date', 's0', 'mu', 'sigma')
+
+def _digest(
+        spots: pd.Series
+) -> str:
+    return hashlib.sha256(np.ascontiguousarray(spots.to_numpy(dtype=float)).tobytes()).hexdigest()
+
+def _return_moments(
+        log_ret: np.ndarray
+) -> tuple[int, float, float]:
+    """
+    (count, mean, M2) of log returns.
+    """
+    n = int(log_ret.size)
+    mean = float(log_ret.mean()) if n else 0.0
+    return n, mean, float(((log_ret - mean) ** 2).sum())
+
+class IncrementalRun:
+    """
+    Day-over-day re-evaluation of the three strategies as the market data gains rows.
+
+    State kept between runs: the spot history digest and the (count, mean, M2) moments of its log returns,
+    the standard normals behind the simulated paths and the last metrics. update() on the new
+    market_data_loader output:
+      - checks the old history is unchanged and merges only the appended returns into the moments
+        (Chan et al.), reproducing estimate_gbm_params without rescanning the history; any other
+        change to the history falls back to a full recalibration,
+      - rebuilds the spots from the cached normals at the new analysis date, s0, mu and sigma
+        (one vectorised pass, same draws every day), only when one of these changed,
+      - re-evaluates only the strategies whose inputs changed (the put also depends on the ATM vols).
+
+    The normals are block_normals(n_paths, n_cashflow_columns, seed), the draws of the engine's exact scheme,
+    so spots and metrics match run_chunked / main.py with the same mu and sigma.
+
+    The analysis date (s0, vol quotes, simulation start) is global_variables.analysis_start_date. With
+    roll_analysis_date it follows the latest quote instead: cashflows dated before it have settled and are
+    left out of the evaluation, and each remaining cashflow date keeps its normal.
+    """
+
+    def __init__(
+            self,
+            market_data: pd.DataFrame,
+            cashflows: pd.DataFrame,
+            global_variables: GlobalVariables,
+            roll_analysis_date: bool = False
+    ) -> None:
+        if global_variables.discretization_method != 'exact':
+            raise ValueError('IncrementalRun rebuilds exact GBM paths: discretization_method must be "exact".')
+        self.cashflows = cashflows.sort_index()
+        self.global_variables = global_variables
+        self.roll_analysis_date = roll_analysis_date
+        self.normals = None
+        self.inputs = {}
+        self.performance = {}
+        self._recalibrate(market_data)
+        self._evaluate(market_data)
+
+    def _spots(
+            self,
+            market_data: pd.DataFrame
+    ) -> pd.Series:
+        return get_spot_prices(market_data=market_data, price='mid').dropna().sort_index()
+
+    def _recalibrate(
+            self,
+            market_data: pd.DataFrame
+    ) -> None:
+        spots = self._spots(market_data)
+        self.last_date = spots.index[-1]
+        self.history_digest = _digest(spots)
+        self.moments = _return_moments(np.diff(np.log(spots.to_numpy(dtype=float))))
+
+    def _append(
+            self,
+            market_data: pd.DataFrame
+    ) -> tuple[list, bool]:
+        """
+        Merges appended spot returns into the moments. Returns (new dates, whether a full recalibration was needed).
+        """
+        spots = self._spots(market_data)
+        old = spots[:self.last_date]
+        if old.empty or old.index[-1] != self.last_date or _digest(old) != self.history_digest:
+            self._recalibrate(market_data)
+            return list(spots.index), True
+
+        new = spots[spots.index > self.last_date]
+        if not new.empty:
+            n_a, mean_a, m2_a = self.moments
+            n_b, mean_b, m2_b = _return_moments(np.diff(np.log(np.concatenate(([old.iloc[-1]], new.to_numpy(dtype=float))))))
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            self.moments = (n, mean_a + delta * n_b / n, m2_a + m2_b + delta ** 2 * n_a * n_b / n)
+            self.last_date = new.index[-1]
+            self.history_digest = _digest(spots)
+        return list(new.index), False
+
+    def _market_inputs(
+            self,
+            market_data: pd.DataFrame
+    ) -> dict:
+        gv = self.global_variables
+        analysis_date = pd.Timestamp(self.last_date if self.roll_analysis_date else gv.analysis_start_date)
+        quote = lambda ticker, price: float(get_latest_quote(
+            market_data=market_data, price=price, analysis_start_date=analysis_date, ticker=ticker).iloc[0])
+        vol_1y, vol_5y = quote('1y_atm_vol', 'ask'), quote('5y_atm_vol', 'ask')
+
+        # estimate_gbm_params from the running moments
+        n, mean, m2 = self.moments
+        dt = 1.0 / gv.steps_per_year
+        sigma = float(np.sqrt(m2 / (n - 1)) / np.sqrt(dt))
+        mu = float(mean / dt + 0.5 * sigma ** 2) if not gv.use_zero_mu else 0.0
+        return {
+            'analysis_date': analysis_date,
+            's0': quote('spot', 'mid'),
+            'mu': mu,
+            'sigma': sigma,
+            'vol_1y': vol_1y / 100.0 if vol_1y > 1.0 else vol_1y,
+            'vol_5y': vol_5y / 100.0 if vol_5y > 1.0 else vol_5y,
+        }
+
+    def _simulate(
+            self,
+            inputs: dict
+    ) -> None:
+        """
+        Exact GBM at the outstanding cashflow dates from the cached normals (drawn once, see block_normals).
+        """
+        gv = self.global_variables
+        self.outstanding = self.cashflows[self.cashflows.index >= inputs['analysis_date']]
+        if self.outstanding.empty:
+            raise ValueError(f"Every cashflow settled before the analysis date {inputs['analysis_date'].date()}.")
+        grid = pd.bdate_range(start=inputs['analysis_date'], end=self.cashflows.index.max())
+        idx = _sample_index(dates=grid, sample_dates=self.outstanding.index)
+        if self.normals is None:
+            self.normals = block_normals(n_paths=gv.n_paths, n_columns=idx.size, seed=gv.seed)
+        # Settled cashflows drop off the front; later dates keep their draws
+        normals = self.normals[:, self.normals.shape[1] - idx.size:]
+
+        dt = 1.0 / gv.steps_per_year
+        n_days = np.diff(idx, prepend=0).astype(float)
+        sigma, mu = inputs['sigma'], inputs['mu']
+        increments = (mu - 0.5 * sigma **2) * dt * n_days + sigma * np.sqrt(dt * n_days) * normals
+        np.cumsum(increments, axis=1, out=increments)
+        increments += np.log(inputs['s0'])
+        self.path_dates, self.spots = grid[idx], np.exp(increments, out=increments)
+
+    def _evaluate(
+            self,
+            market_data: pd.DataFrame
+    ) -> list[str]:
+        """
+        Re-evaluates the strategies affected by changed inputs. Returns their names.
+        """
+        inputs = self._market_inputs(market_data)
+        changed = {k for k in inputs if self.inputs.get(k) != inputs[k]}
+        if changed & set(SPOT_INPUTS) or self.normals is None:
+            self._simulate(inputs)
+            affected = list(STRATEGY_INPUTS)
+        else:
+            affected = [name for name, deps in STRATEGY_INPUTS.items() if changed & set(deps)]
+        self.inputs = inputs
+
+        if affected:
+            gv = replace(self.global_variables, analysis_start_date=inputs['analysis_date'])
+            schedule = Schedule.from_global_variables(
+                cashflows=self.outstanding, path_dates=self.path_dates, s0=inputs['s0'], global_variables=gv)
+            self.performance.update(evaluate_strategies(
+                spot_samples=self.spots, path_dates=self.path_dates, cashflows=self.outstanding, s0=inputs['s0'],
+                vol_1y=inputs['vol_1y'], vol_5y=inputs['vol_5y'], global_variables=gv, strategies=affected,
+                schedule=schedule))
+        return affected
+
+    def update(
+            self,
+            market_data: pd.DataFrame
+    ) -> dict:
+        """
+        Brings the run up to date with market_data (market_data_loader output with rows appended since the last
+        run, or revised quotes on the latest date). Returns the new dates, whether the history had to be
+        recalibrated in full and the re-evaluated strategies; metrics are in self.performance.
+        """
+        new_dates, full = self._append(market_data)
+        recomputed = self._evaluate(market_data)
+        return {'new_dates': new_dates, 'full_recalibration': full, 'recomputed': recomputed}
+
+    def metrics(self) -> dict:
+        return {name: {m: perf[m] for m in METRICS} for name, perf in self.performance.items()}
+
+    def save(
+            self,
+            path: str
+    ) -> None:
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(
+            path: str
+    ) -> 'IncrementalRun':
+        with open(path, 'rb') as f:
+            return pickle.load(f)
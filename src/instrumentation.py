@@ -0,0 +1,138 @@
+# Instrumentation Module
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional
+
+_ACTIVE: Optional['Profiler'] = None              # Set by profile(); None means instrumentation is off
+
+class Profiler:
+    """
+    Per-stage wall / CPU time, call counts and (optionally) peak traced allocation, plus named counters.
+    Stages nest: a stage's times and peak include its sub-stages. Only the current process is recorded.
+    """
+    def __init__(
+            self,
+            memory: bool = False
+    ) -> None:
+        self.memory = memory
+        self.stages = defaultdict(lambda: {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_mb': 0.0})
+        self.counters = defaultdict(float)
+        self._memory_stack = []                      # [traced memory at entry, peak seen by sub-stages]
+        self._started = time.perf_counter()
+        self._wall_s = None
+
+    @contextmanager
+    def stage(
+            self,
+            name: str
+    ) -> Iterator[None]:
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._memory_stack:
+                self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._memory_stack.append([current, 0])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats = self.stages[name]
+            stats['calls'] += 1
+            stats['wall_s'] += time.perf_counter() - wall
+            stats['cpu_s'] += time.process_time() - cpu
+            if self.memory:
+                entry, sub_peak = self._memory_stack.pop()
+                peak = max(tracemalloc.get_traced_memory()[1], sub_peak)
+                stats['peak_mb'] = max(stats['peak_mb'], (peak - entry) / 2**20)
+                if self._memory_stack:
+                    self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+
+    def report(self) -> dict:
+        """
+        {'wall_s', 'stages': {name: {calls, wall_s, cpu_s[, peak_mb]}}, 'counters', 'derived'}; derived holds the
+        NaN-IRR rate and mean root-finder iterations when IRRs were computed.
+        """
+        stages = {
+            name: {k: v for k, v in stats.items() if self.memory or k != 'peak_mb'}
+            for name, stats in self.stages.items()
+        }
+        c = self.counters
+        derived = {}
+        if c.get('irr.paths'):
+            derived['irr_nan_rate'] = c['irr.nan'] / c['irr.paths']
+        if c.get('irr.brentq_calls'):
+            derived['brentq_iterations_per_call'] = c['irr.brentq_iterations'] / c['irr.brentq_calls']
+        if c.get('irr_batch.solved_paths'):
+            derived['irr_batch_iterations_per_path'] = c['irr_batch.path_iterations'] / c['irr_batch.solved_paths']
+        wall = self._wall_s if self._wall_s is not None else time.perf_counter() - self._started
+        return {'wall_s': wall, 'stages': stages, 'counters': dict(c), 'derived': derived}
+
+    def to_json(
+            self,
+            path: Optional[str] = None
+    ) -> str:
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+@contextmanager
+def profile(
+        memory: bool = False
+) -> Iterator[Profiler]:
+    """
+    Turns instrumentation on for the block and yields the Profiler collecting it:
+
+        with profile(memory=True) as profiler:
+            ...run the pipeline...
+        profiler.report()
+
+    memory=True traces allocations with tracemalloc (slower; peaks are numpy/python allocations above the
+    level at stage entry). Outside a profile block instrumented functions only pay one global lookup.
+    """
+    global _ACTIVE
+    previous, profiler = _ACTIVE, Profiler(memory=memory)
+    start_tracing = memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    _ACTIVE = profiler
+    try:
+        yield profiler
+    finally:
+        _ACTIVE = previous
+        profiler._wall_s = time.perf_counter() - profiler._started
+        if start_tracing:
+            tracemalloc.stop()
+
+def instrument(
+        stage: str
+) -> Callable:
+    """
+    Decorator recording every call of the function as stage (when a profile block is active).
+    """
+    def _decorate(fn: Callable) -> Callable:
+        @wraps(fn)
+        def _wrapper(*args, **kwargs):
+            profiler = _ACTIVE
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.stage(stage):
+                return fn(*args, **kwargs)
+        return _wrapper
+    return _decorate
+
+def count(
+        name: str,
+        value: float = 1
+) -> None:
+    """
+    Adds value to counter name (no-op when instrumentation is off).
+    """
+    profiler = _ACTIVE
+    if profiler is not None:
+        profiler.counters[name] += value
@@ -0,0 +1,62 @@
+# Monte Carlo Estimators Module
+from typing import Optional
+
+import numpy as np
+
+def mean_with_error(
+    y: np.ndarray,
+    variance_reduction: str = 'none',
+    controls: Optional[np.ndarray] = None,
+    control_means: Optional[np.ndarray] = None,
+) -> dict:
+    """
+    Mean of a per-path metric with its standard error and the achieved variance reduction factor
+    (vrf = plain MC variance of the mean / variance of this estimator, 1.0 for 'none').
+
+    'none'            : y (n_paths,) from plain sampling.
+    'antithetic'      : y (n_paths,) from variance_reduction='antithetic' paths, pairs (i, i + n_paths/2).
+    'control_variate' : y (n_paths,), controls (n_paths, k) with known means control_means (k,),
+                        e.g. spots at the cashflow dates and fx_simulator.expected_spots. Regression beta.
+    'sobol'           : y (n_replications, n_paths), one row per independently scrambled Sobol run;
+                        the error comes from the spread of the replication means.
+    Non-finite values (e.g. NaN IRR) are dropped (with their antithetic partner / controls row).
+    """
+    y = np.asarray(y, dtype=float)
+
+    if variance_reduction == 'sobol':
+        y = np.atleast_2d(y)
+        means = np.array([row[np.isfinite(row)].mean() for row in y])
+        pooled = y[np.isfinite(y)]
+        stderr = means.std(ddof=1) / np.sqrt(means.size) if means.size > 1 else np.nan
+        plain = pooled.var(ddof=1) / pooled.size
+        return {'mean': float(means.mean()), 'stderr': float(stderr), 'vrf': float(plain / stderr**2), 'n': int(pooled.size)}
+
+    if variance_reduction == 'antithetic':
+        half = y.size // 2
+        pairs = np.column_stack([y[:half], y[half:2 * half]])
+        pairs = pairs[np.isfinite(pairs).all(axis=1)]
+        pair_means = pairs.mean(axis=1)
+        stderr = pair_means.std(ddof=1) / np.sqrt(pair_means.size)
+        plain = pairs.ravel().var(ddof=1) / pairs.size
+        return {'mean': float(pair_means.mean()), 'stderr': float(stderr), 'vrf': float(plain / stderr**2), 'n': int(pairs.size)}
+
+    if variance_reduction == 'control_variate':
+        if controls is None or control_means is None:
+            raise ValueError('control_variate needs controls and control_means.')
+        X = np.asarray(controls, dtype=float).reshape(y.size, -1)
+        keep = np.isfinite(y) & np.isfinite(X).all(axis=1)
+        y, X = y[keep], X[keep] - np.asarray(control_means, dtype=float)
+
+        Xc = X - X.mean(axis=0)
+        beta = np.linalg.lstsq(Xc, y - y.mean(), rcond=None)[0]
+        adjusted = y - X @ beta
+        resid = adjusted - adjusted.mean()
+        stderr = np.sqrt((resid @ resid) / (y.size - 1 - beta.size) / y.size)
+        return {'mean': float(adjusted.mean()), 'stderr': float(stderr), 'vrf': float(y.var(ddof=1) / y.size / stderr**2),
+                'n': int(y.size), 'beta': beta}
+
+    if variance_reduction == 'none':
+        y = y[np.isfinite(y)]
+        return {'mean': float(y.mean()), 'stderr': float(y.std(ddof=1) / np.sqrt(y.size)), 'vrf': 1.0, 'n': int(y.size)}
+
+    raise ValueError("variance_reduction must be one of: 'none', 'antithetic', 'control_variate', 'sobol'")
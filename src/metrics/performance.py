@@ -1,9 +1,14 @@
 # Performance Metrics Module
+from typing import TYPE_CHECKING, Optional
 import warnings
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import brentq
+
+from src.instrumentation import count, instrument
+
+if TYPE_CHECKING:
+    from src.schedule import Schedule
 
 def _yearfrac(start_date: pd.Timestamp,
               end_date: pd.Timestamp
@@ -15,23 +20,47 @@ def _yearfrac(start_date: pd.Timestamp,
     """
     return (end_date - start_date).days / 365.0
 
+def _yearfracs(start_date: pd.Timestamp,
+               dates: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorised _yearfrac over an array of dates (same actual/365 basis).
+    """
+    deltas = pd.DatetimeIndex(dates) - pd.Timestamp(start_date)
+    return np.asarray(deltas.days, dtype=float) / 365.0
+
 # Terminal Value
 def terminal_value(cashflows: np.ndarray) -> float:
     cfs = np.asarray(cashflows)
     return float(cfs.sum())
 
+@instrument('metrics.terminal_value')
+def terminal_value_batch(cashflows_matrix: np.ndarray,
+                         premium: float = 0.0
+) -> np.ndarray:
+    """
+    terminal_value for every row of an (n_paths, n_cashflows) matrix, premium charged on the first cashflow.
+    """
+    return np.asarray(cashflows_matrix, dtype=float).sum(axis=1) - premium
+
 # Internal Rate of Return
+@instrument('metrics.irr')
 def irr(cashflow_dates: np.ndarray,
         cashflows: np.ndarray,
         start_date: pd.Timestamp = pd.Timestamp('2025-10-01'),
         brent_lims: tuple[float, float] = (-0.999, 10.0),
+        schedule: Optional['Schedule'] = None,
 ) -> np.ndarray:
     """
     Internal Rate of Return gives us the annualised rate, r, where NPV = 0.
     Akin to an annualised compound rate you would find in your bank account.
     If your funding rate falls below this value, then its not a good investment.
+    schedule: use its irr_year_fractions (from the first cashflow date) instead of cashflow_dates/start_date.
     """
-    year_fractions = np.asarray([_yearfrac(start_date=pd.Timestamp(start_date), end_date=pd.Timestamp(date)) for date in cashflow_dates])
+    if schedule is not None:
+        year_fractions = schedule.irr_year_fractions
+    else:
+        year_fractions = np.asarray([_yearfrac(start_date=pd.Timestamp(start_date), end_date=pd.Timestamp(date)) for date in cashflow_dates])
 
     def _npv(r: float
     ) -> float:
@@ -39,29 +68,145 @@ def irr(cashflow_dates: np.ndarray,
     
     a, b = brent_lims
     
+    count('irr.paths')
+
     # Condition for brent
     if np.sign(_npv(a)) == np.sign(_npv(b)):
         warnings.warn("No root found, brent condition f(a)•f(b) < 0 not satisfied.",
         category=UserWarning,
         stacklevel=2
         )
-        return np.NaN
+        count('irr.nan')
+        return np.nan
     
-    return float(brentq(_npv, a, b))  
+    from scipy.optimize import brentq                # Lazy: only the scalar IRR needs scipy
+
+    root, result = brentq(_npv, a, b, full_output=True)
+    count('irr.brentq_calls')
+    count('irr.brentq_iterations', result.iterations)
+    return float(root)
+
+# Internal Rate of Return (Batch)
+@instrument('metrics.irr_batch')
+def irr_batch(cashflow_dates: np.ndarray,
+              cashflows_matrix: np.ndarray,
+              start_date: pd.Timestamp = pd.Timestamp('2025-10-01'),
+              brent_lims: tuple[float, float] = (-0.999, 10.0),
+              xtol: float = 2e-12,
+              max_iter: int = 200,
+              schedule: Optional['Schedule'] = None,
+) -> np.ndarray:
+    """
+    IRR for every row of an (n_paths, n_cashflows) matrix at once, same bracket and NaN-on-no-root
+    semantics as irr. Solved with a safeguarded Newton: each step stays inside the per-path bracket
+    [lo, hi] and falls back to bisection when Newton would leave it, so convergence is guaranteed.
+    schedule: use its irr_year_fractions (from the first cashflow date) instead of cashflow_dates/start_date.
+    """
+    cfs = np.atleast_2d(np.asarray(cashflows_matrix, dtype=float))
+    if schedule is not None:
+        year_fractions = schedule.irr_year_fractions
+    else:
+        year_fractions = _yearfracs(start_date=start_date, dates=cashflow_dates)
+    n_paths = cfs.shape[0]
+
+    a, b = brent_lims
+    f_a = cfs @ (1 + a) ** -year_fractions
+    f_b = cfs @ (1 + b) ** -year_fractions
+
+    out = np.full(n_paths, np.nan, dtype=float)
+
+    # Condition for brent
+    no_root = np.sign(f_a) == np.sign(f_b)
+    if no_root.any():
+        warnings.warn(f"No root found for {int(no_root.sum())} of {n_paths} paths, "
+                      "brent condition f(a)•f(b) < 0 not satisfied.",
+        category=UserWarning,
+        stacklevel=2
+        )
+    out[(f_a == 0) & ~no_root] = a
+    out[(f_b == 0) & ~no_root] = b
+
+    # Paths still to solve (non-finite cashflows stay NaN)
+    idx = np.flatnonzero(~no_root & (f_a != 0) & (f_b != 0) & np.isfinite(f_a) & np.isfinite(f_b))
+    cfs = cfs[idx]
+    lo = np.full(idx.size, a)
+    hi = np.full(idx.size, b)
+    f_lo = f_a[idx]
+    r = np.full(idx.size, 0.1 if a < 0.1 < b else 0.5 * (a + b))
+
+    count('irr_batch.solved_paths', idx.size)
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        count('irr_batch.iterations')
+        count('irr_batch.path_iterations', idx.size)
+
+        disc = (1 + r[:, None]) ** -year_fractions
+        f = np.sum(cfs * disc, axis=1)
+        df = np.sum(-year_fractions * cfs * disc, axis=1) / (1 + r)
+
+        # Shrinking the bracket around the sign change
+        same_side = np.sign(f) == np.sign(f_lo)
+        lo = np.where(same_side, r, lo)
+        f_lo = np.where(same_side, f, f_lo)
+        hi = np.where(same_side, hi, r)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r_new = r - f / df
+        bisect = ~np.isfinite(r_new) | (r_new <= lo) | (r_new >= hi)
+        r_new = np.where(bisect, 0.5 * (lo + hi), r_new)
+
+        done = (f == 0) | (np.abs(r_new - r) <= xtol + 4 * np.finfo(float).eps * np.abs(r_new)) | (hi - lo <= xtol)
+        out[idx[done]] = np.where(f[done] == 0, r[done], r_new[done])
+
+        keep = ~done
+        idx, cfs, lo, hi, f_lo, r = idx[keep], cfs[keep], lo[keep], hi[keep], f_lo[keep], r_new[keep]
+
+    out[idx] = r
+    count('irr.paths', n_paths)
+    count('irr.nan', int(np.isnan(out).sum()))
+    return out
 
 # Net Present Value
+@instrument('metrics.npv')
 def npv(cashflow_dates: np.ndarray,
         cashflows: np.ndarray,
         r: float,
-        start_date: pd.Timestamp = pd.Timestamp('2025-08-01')
+        start_date: pd.Timestamp = pd.Timestamp('2025-08-01'),
+        schedule: Optional['Schedule'] = None
 ) -> float:
     """
     Net Present Value created at start_date (2025-08-01 by default) vs. a given discount rate r.
     If negative then loosing money.
+    schedule: use its year_fractions (from its start_date) instead of cashflow_dates/start_date.
     """
-    year_fractions = np.asarray([_yearfrac(start_date=start_date, end_date=date) for date in cashflow_dates])
+    if schedule is not None:
+        year_fractions = schedule.year_fractions
+    else:
+        year_fractions = np.asarray([_yearfrac(start_date=start_date, end_date=date) for date in cashflow_dates])
     return np.sum(cashflows / (1 + r) ** year_fractions)
 
+def discount_factors(cashflow_dates: np.ndarray,
+                     r: float,
+                     start_date: pd.Timestamp = pd.Timestamp('2025-08-01')
+) -> np.ndarray:
+    """
+    (1 + r)^-yearfrac per cashflow date, the weights npv applies. Compute once, reuse for every path.
+    """
+    return (1 + r) ** -_yearfracs(start_date=start_date, dates=cashflow_dates)
+
+@instrument('metrics.npv_batch')
+def npv_batch(cashflows_matrix: np.ndarray,
+              discount_factors: np.ndarray,
+              premium: float = 0.0
+) -> np.ndarray:
+    """
+    npv for every row of an (n_paths, n_cashflows) matrix as one matrix-vector product.
+    premium is charged on the first cashflow (as cashflow_usd[0] -= premium) without copying the matrix.
+    """
+    cfs = np.asarray(cashflows_matrix, dtype=float)
+    return cfs @ discount_factors - premium * discount_factors[0]
+
 # Multiple on Invested Capital
 def moic(cashflows: np.ndarray) -> float:
     """
@@ -71,6 +216,27 @@ def moic(cashflows: np.ndarray) -> float:
     outflows=cashflows[cashflows<0]
     return np.sum(inflows) / np.sum(np.abs(outflows))
 
+@instrument('metrics.moic_batch')
+def moic_batch(cashflows_matrix: np.ndarray,
+               premium: float = 0.0
+) -> np.ndarray:
+    """
+    moic for every row of an (n_paths, n_cashflows) matrix, premium charged on the first cashflow.
+    Rows without outflows have no multiple: NaN (where moic would divide by zero).
+    """
+    cfs = np.asarray(cashflows_matrix, dtype=float)
+    inflows = np.maximum(cfs, 0.0).sum(axis=1)
+    outflows = np.maximum(-cfs, 0.0).sum(axis=1)
+
+    if premium != 0.0:
+        # Re-classify the first cashflow once the premium is charged
+        first = cfs[:, 0]
+        charged = first - premium
+        inflows += np.maximum(charged, 0.0) - np.maximum(first, 0.0)
+        outflows += np.maximum(-charged, 0.0) - np.maximum(-first, 0.0)
+
+    return np.divide(inflows, outflows, out=np.full_like(inflows, np.nan), where=outflows > 0)
+
 #def dscr(cashflow_dates: pd.DatetimeIndex,
 #        cashflows: np.ndarray,
 #         origination_date: pd.Timestamp = pd.Timestamp('2025-10-01'),
@@ -1,6 +1,8 @@
 # Risk Metrics Module
 import numpy as np
 
+from src.instrumentation import instrument
+
 def _clean_1d(
     x: np.ndarray
 ) -> np.ndarray:
@@ -53,6 +55,7 @@ def prob_above(
     x = _clean_1d(x)
     return float((x > threshold).mean()) if x.size else float('nan')
 
+@instrument('risk.summary')
 def risk_summary_for_metric(
     metric: np.ndarray,
     alpha: float = 0.95,
@@ -104,4 +107,117 @@ def risk_summary_for_metric(
         f'VaR{int(alpha*100)}_loss': float(var_a) if np.isfinite(var_a) else np.nan,
         f'ES{int(alpha*100)}_loss': float(es_a) if np.isfinite(es_a) else np.nan,
     })
-    return out
\ No newline at end of file
+    return out
+
+# Loss variable per metric, as used throughout the notebook: L = max(0, threshold - metric)
+METRIC_LOSS_MODES = {
+    'npv': 'npv_shortfall',
+    'irr': 'irr_shortfall',
+    'moic': 'moic_shortfall',
+    'terminal': 'none',
+}
+
+LOSS_THRESHOLDS = {
+    'npv_shortfall': 0.0,
+    'irr_shortfall': 0.0,
+    'moic_shortfall': 1.0,
+    'none': None,
+}
+
+def _lerp(
+    a: float,
+    b: float,
+    w: float
+) -> float:
+    """
+    Same interpolation (and rounding) as numpy's linear quantile method.
+    """
+    return float(b - (b - a) * (1 - w)) if w >= 0.5 else float(a + (b - a) * w)
+
+def _lerp_quantile(
+    x: np.ndarray,
+    n: int,
+    q: float
+) -> float:
+    """
+    np.quantile (linear) of x, provided x is partitioned around the floor/ceil ranks of (n - 1) * q.
+    """
+    h = (n - 1) * q
+    lo = int(np.floor(h))
+    return _lerp(x[lo], x[min(lo + 1, n - 1)], h - lo)
+
+@instrument('risk.report')
+def risk_report(
+    metric_matrix: np.ndarray,
+    alpha: float = 0.95,
+    loss_modes: tuple[str, ...] = ('none',)
+) -> list[dict]:
+    """
+    Fused risk_summary_for_metric over every column of an (n_paths, n_columns) matrix, e.g. n_metrics x
+    n_strategies side by side. A single np.partition per column (on all the ranks needed at once) gives
+    p05/p50/p95 and VaR; ES and the threshold probabilities are one more linear pass. Non-finite values are
+    dropped per column, as in _clean_1d.
+
+    loss_modes: one loss mode per column (or a single one for all). Besides the risk_summary_for_metric keys,
+    each dict holds P_below / P_above: P(metric < c) and P(metric > c) at the loss threshold c (NaN for 'none').
+    """
+    M = np.asarray(metric_matrix, dtype=float)
+    if M.ndim == 1:
+        M = M[:, None]
+    n_cols = M.shape[1]
+
+    loss_modes = tuple(loss_modes)
+    if len(loss_modes) == 1:
+        loss_modes = loss_modes * n_cols
+    if len(loss_modes) != n_cols:
+        raise ValueError('loss_modes must have one entry per column (or a single entry).')
+    for loss in loss_modes:
+        if loss not in LOSS_THRESHOLDS:
+            raise ValueError('loss must be one of: npv_shortfall, irr_shortfall, moic_shortfall, none')
+
+    label = int(alpha * 100)
+    out = []
+    for j in range(n_cols):
+        x = M[:, j]
+        x = x[np.isfinite(x)]
+        n = x.size
+        c = LOSS_THRESHOLDS[loss_modes[j]]
+
+        if n == 0:
+            out.append({'n': 0, 'mean': np.nan, 'std': np.nan, 'p05': np.nan, 'p50': np.nan, 'p95': np.nan,
+                        f'VaR{label}_loss': np.nan, f'ES{label}_loss': np.nan, 'P_below': np.nan, 'P_above': np.nan})
+            continue
+
+        # Ranks needed: metric quantiles, plus the loss quantile mirrored into metric space
+        # (L = max(0, c - metric) is decreasing, so rank h in L is rank n - 1 - h in the metric)
+        quantiles = (0.05, 0.50, 0.95)
+        ranks = {r for q in quantiles for r in (int(np.floor((n - 1) * q)), min(int(np.floor((n - 1) * q)) + 1, n - 1))}
+        h_loss = (n - 1) * alpha
+        loss_ranks = (int(np.floor(h_loss)), min(int(np.floor(h_loss)) + 1, n - 1))
+        ranks |= {n - 1 - r for r in loss_ranks}
+        x = np.partition(x, sorted(ranks))
+
+        mean = float(x.mean())
+        row = {
+            'n': int(n),
+            'mean': mean,
+            'std': float(np.sqrt(((x - mean) ** 2).sum() / (n - 1))) if n > 1 else 0.0,
+            **{f'p{int(round(q * 100)):02d}': _lerp_quantile(x, n, q) for q in quantiles},
+            f'VaR{label}_loss': np.nan,
+            f'ES{label}_loss': np.nan,
+            'P_below': np.nan,
+            'P_above': np.nan,
+        }
+
+        if c is not None:
+            L = np.maximum(0.0, c - x)
+            var_a = _lerp(L[n - 1 - loss_ranks[0]], L[n - 1 - loss_ranks[1]], h_loss - loss_ranks[0])
+            tail = L[L >= var_a]
+            row.update({
+                f'VaR{label}_loss': var_a,
+                f'ES{label}_loss': float(tail.mean()) if tail.size else np.nan,
+                'P_below': float((x < c).mean()),
+                'P_above': float((x > c).mean()),
+            })
+        out.append(row)
+    return out
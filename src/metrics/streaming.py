@@ -0,0 +1,275 @@
+# Streaming Risk Metrics Module
+from typing import Optional
+
+import numpy as np
+
+from src.metrics.risk import LOSS_THRESHOLDS, _clean_1d
+
+class StreamingRiskSummary:
+    """
+    Mergeable, bounded-memory counterpart of risk_summary_for_metric for one metric.
+
+    Consumes chunks of metric values with update() and combines partial results (e.g. from workers) with
+    merge(). Keeps:
+      - count / mean / M2 (Chan et al. parallel update) for mean and std,
+      - a fixed-bin histogram on [lo, hi] with per-bin sums for p05/p50/p95, VaR and ES,
+      - exact buffers of the values falling outside [lo, hi] (the far tails are answered exactly),
+      - exact counts and sums around the loss threshold and any extra `thresholds` for prob_below/prob_above.
+
+    Quantiles inside [lo, hi] are exact up to one bin width; choose [lo, hi] to cover the bulk of the
+    distribution (from_sample does this from a pilot chunk). Accumulators only merge if built on the same
+    bins, alpha, loss and thresholds; use empty_like() to create compatible ones.
+    """
+
+    def __init__(
+        self,
+        lo: float,
+        hi: float,
+        n_bins: int = 8192,
+        alpha: float = 0.95,
+        loss: str = 'none',
+        thresholds: tuple[float, ...] = (),
+    ) -> None:
+        if loss not in LOSS_THRESHOLDS:
+            raise ValueError('loss must be one of: npv_shortfall, irr_shortfall, moic_shortfall, none')
+        if not hi > lo or n_bins <= 0:
+            raise ValueError('Need hi > lo and n_bins > 0.')
+
+        self.edges = np.linspace(lo, hi, n_bins + 1)
+        self.alpha = alpha
+        self.loss = loss
+
+        threshold = LOSS_THRESHOLDS[loss]
+        self.thresholds = tuple(sorted(set(thresholds) | ({threshold} if threshold is not None else set())))
+
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.sums = np.zeros(n_bins, dtype=float)
+        self.below = np.empty(0, dtype=float)
+        self.above = np.empty(0, dtype=float)
+        self.n_below = np.zeros(len(self.thresholds), dtype=np.int64)
+        self.sum_below = np.zeros(len(self.thresholds), dtype=float)
+        self.n_above = np.zeros(len(self.thresholds), dtype=np.int64)
+
+    @classmethod
+    def from_sample(
+        cls,
+        x: np.ndarray,
+        n_bins: int = 8192,
+        alpha: float = 0.95,
+        loss: str = 'none',
+        thresholds: tuple[float, ...] = (),
+        pad: float = 0.25,
+    ) -> 'StreamingRiskSummary':
+        """
+        Fixes the bins from a pilot chunk (its range widened by `pad` on each side) and consumes it.
+        """
+        x = _clean_1d(x)
+        lo, hi = (float(x.min()), float(x.max())) if x.size else (-1.0, 1.0)
+        width = (hi - lo) or max(abs(lo), 1.0)
+        acc = cls(lo - pad * width, hi + pad * width, n_bins=n_bins, alpha=alpha, loss=loss, thresholds=thresholds)
+        return acc.update(x)
+
+    def empty_like(self) -> 'StreamingRiskSummary':
+        return StreamingRiskSummary(
+            self.edges[0], self.edges[-1], n_bins=self.counts.size,
+            alpha=self.alpha, loss=self.loss, thresholds=self.thresholds)
+
+    def update(
+        self,
+        x: np.ndarray
+    ) -> 'StreamingRiskSummary':
+        x = _clean_1d(x)
+        if x.size == 0:
+            return self
+
+        chunk = StreamingRiskSummary.empty_like(self)
+        chunk.n = int(x.size)
+        chunk.mean = float(x.mean())
+        chunk.m2 = float(((x - chunk.mean) ** 2).sum())
+
+        lo, hi = self.edges[0], self.edges[-1]
+        inside = (x >= lo) & (x <= hi)
+        bins = np.minimum(np.searchsorted(self.edges, x[inside], side='right') - 1, self.counts.size - 1)
+        chunk.counts = np.bincount(bins, minlength=self.counts.size)
+        chunk.sums = np.bincount(bins, weights=x[inside], minlength=self.counts.size)
+        chunk.below = x[x < lo]
+        chunk.above = x[x > hi]
+
+        for i, t in enumerate(self.thresholds):
+            mask = x < t
+            chunk.n_below[i] = mask.sum()
+            chunk.sum_below[i] = x[mask].sum()
+            chunk.n_above[i] = (x > t).sum()
+
+        return self.merge(chunk)
+
+    def merge(
+        self,
+        other: 'StreamingRiskSummary'
+    ) -> 'StreamingRiskSummary':
+        if (other.counts.size != self.counts.size or other.edges[0] != self.edges[0] or other.edges[-1] != self.edges[-1]
+                or other.alpha != self.alpha or other.loss != self.loss or other.thresholds != self.thresholds):
+            raise ValueError('Can only merge accumulators built with the same bins, alpha, loss and thresholds.')
+        if other.n == 0:
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta**2 * self.n * other.n / n
+        self.n = n
+
+        self.counts += other.counts
+        self.sums += other.sums
+        self.below = np.concatenate([self.below, other.below])
+        self.above = np.concatenate([self.above, other.above])
+        self.n_below += other.n_below
+        self.sum_below += other.sum_below
+        self.n_above += other.n_above
+        return self
+
+    def _sorted_layout(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        below = np.sort(self.below)
+        above = np.sort(self.above)
+        cum = below.size + np.concatenate([[0], np.cumsum(self.counts)])  # rank of the first value in each bin
+        return below, above, cum
+
+    def quantile(
+        self,
+        q: float
+    ) -> float:
+        """
+        Approximates np.quantile (linear method): exact in the out-of-range buffers, uniform within a bin.
+        """
+        if self.n == 0:
+            return np.nan
+        below, above, cum = self._sorted_layout()
+        h = (self.n - 1) * q
+        return float(self._value_at_rank(h, below, above, cum))
+
+    def _value_at_rank(
+        self,
+        h: float,
+        below: np.ndarray,
+        above: np.ndarray,
+        cum: np.ndarray
+    ) -> float:
+        if h < below.size:
+            return np.interp(h, np.arange(below.size), below)
+        if h >= cum[-1]:
+            return np.interp(h - cum[-1], np.arange(above.size), above)
+        b = np.searchsorted(cum, h, side='right') - 1
+        left, width = self.edges[b], self.edges[b + 1] - self.edges[b]
+        return left + width * (h - cum[b] + 0.5) / self.counts[b]
+
+    def _lower_tail_sum(
+        self,
+        k: float,
+        below: np.ndarray,
+        above: np.ndarray,
+        cum: np.ndarray
+    ) -> float:
+        """
+        Sum of the k smallest values (fractional k takes that share of the next value; within a bin, values
+        are assumed uniform).
+        """
+        if k <= below.size:
+            n_full = int(np.floor(k))
+            return float(below[:n_full].sum() + (k - n_full) * (below[n_full] if n_full < below.size else 0.0))
+        if k >= cum[-1]:
+            r = k - cum[-1]
+            n_full = int(np.floor(r))
+            partial = (r - n_full) * (above[n_full] if n_full < above.size else 0.0)
+            return float(below.sum() + self.sums.sum() + above[:n_full].sum() + partial)
+        b = np.searchsorted(cum, k, side='right') - 1
+        frac = (k - cum[b]) / self.counts[b]
+        left, width = self.edges[b], self.edges[b + 1] - self.edges[b]
+        return float(below.sum() + self.sums[:b].sum() + (k - cum[b]) * (left + 0.5 * frac * width))
+
+    def prob_below(
+        self,
+        threshold: float = 0.0
+    ) -> float:
+        if threshold not in self.thresholds:
+            raise KeyError(f'threshold {threshold} was not registered (thresholds={self.thresholds}).')
+        return float(self.n_below[self.thresholds.index(threshold)] / self.n) if self.n else float('nan')
+
+    def prob_above(
+        self,
+        threshold: float = 0.0
+    ) -> float:
+        if threshold not in self.thresholds:
+            raise KeyError(f'threshold {threshold} was not registered (thresholds={self.thresholds}).')
+        return float(self.n_above[self.thresholds.index(threshold)] / self.n) if self.n else float('nan')
+
+    def var_es(self) -> tuple[float, float]:
+        """
+        VaR/ES of the loss L = max(0, c - metric) at alpha, c being the loss mode threshold (see var_es).
+        L is decreasing in the metric, so VaR maps to the (1 - alpha) metric quantile and the ES tail to
+        the metric's lower tail.
+        """
+        c = LOSS_THRESHOLDS[self.loss]
+        if c is None or self.n == 0:
+            return np.nan, np.nan
+
+        below, above, cum = self._sorted_layout()
+        m_q = self._value_at_rank((self.n - 1) * (1 - self.alpha), below, above, cum)
+        var_a = float(max(0.0, c - m_q))
+
+        i = self.thresholds.index(c)
+        if var_a == 0.0:
+            # Every loss is >= 0: ES is the mean shortfall over all paths
+            return var_a, float((c * self.n_below[i] - self.sum_below[i]) / self.n)
+
+        # Tail L >= VaR <=> metric <= m_q
+        k = (self.n - 1) * (1 - self.alpha) + 1
+        return var_a, float(c - self._lower_tail_sum(k, below, above, cum) / k)
+
+    def summary(self) -> dict:
+        """
+        Same keys as risk_summary_for_metric.
+        """
+        label = int(self.alpha * 100)
+        if self.n == 0:
+            return {'n': 0, 'mean': np.nan, 'std': np.nan, 'p05': np.nan, 'p50': np.nan, 'p95': np.nan,
+                    f'VaR{label}_loss': np.nan, f'ES{label}_loss': np.nan}
+
+        var_a, es_a = self.var_es()
+        return {
+            'n': int(self.n),
+            'mean': float(self.mean),
+            'std': float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else 0.0,
+            'p05': self.quantile(0.05),
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            f'VaR{label}_loss': var_a,
+            f'ES{label}_loss': es_a,
+        }
+
+def streaming_risk_summaries(
+        chunks,
+        metric_loss_modes: dict,
+        alpha: float = 0.95,
+        n_bins: int = 8192,
+        thresholds: Optional[dict] = None
+) -> dict:
+    """
+    Consumes an iterable of (paths, performance) chunks (src.engine.iter_performance_chunks) into one
+    StreamingRiskSummary per (strategy, metric). The first chunk fixes the bins.
+    """
+    thresholds = thresholds or {}
+    out = {}
+    for _, performance in chunks:
+        for strategy, results in performance.items():
+            accs = out.setdefault(strategy, {})
+            for metric, loss in metric_loss_modes.items():
+                if metric in accs:
+                    accs[metric].update(results[metric])
+                else:
+                    accs[metric] = StreamingRiskSummary.from_sample(
+                        results[metric], n_bins=n_bins, alpha=alpha, loss=loss,
+                        thresholds=tuple(thresholds.get(metric, ())))
+    return out
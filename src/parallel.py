@@ -0,0 +1,87 @@
+# Parallel Runner Module
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.engine import BLOCK_SIZE, METRICS, STRATEGIES, iter_performance_chunks
+
+def _run_shard(
+        shm_name: str,
+        n_paths: int,
+        paths: slice,
+        global_variables: GlobalVariables,
+        market: dict
+) -> Optional[dict]:
+    """
+    Worker: runs the chunked pipeline over one range of paths and writes the metrics straight into the
+    parent's (n_strategies, n_metrics, n_paths) shared buffer. Only the first shard returns the (small)
+    path-independent fields: premium, forwards, strikes, vols_used.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((len(STRATEGIES), len(METRICS), n_paths), dtype=float, buffer=shm.buf)
+        static = None
+        for chunk, performance in iter_performance_chunks(global_variables=global_variables, paths=paths, **market):
+            for i, strategy in enumerate(STRATEGIES):
+                for j, m in enumerate(METRICS):
+                    out[i, j, chunk] = performance[strategy][m]
+            if static is None and paths.start == 0:
+                static = {
+                    strategy: {k: v for k, v in results.items() if k not in METRICS}
+                    for strategy, results in performance.items()
+                }
+        del out
+        return static
+    finally:
+        shm.close()
+
+def run_parallel(
+        global_variables: GlobalVariables,
+        s0: float,
+        mu: float,
+        sigma: float,
+        cashflows: pd.DataFrame,
+        vol_1y: float,
+        vol_5y: float,
+        max_workers: Optional[int] = None,
+        shards_per_worker: int = 4
+) -> dict:
+    """
+    Same output as src.engine.run_chunked, with n_paths sharded across a ProcessPoolExecutor.
+
+    Shards are aligned to the engine's SeedSequence blocks, and every path's random stream depends only on
+    its block, so results are identical for any max_workers. Metric arrays come back through shared memory
+    rather than being pickled.
+    """
+    gv = global_variables
+    n_paths = gv.n_paths
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Shards: whole blocks, a few per worker for load balancing
+    n_blocks = -(-n_paths // BLOCK_SIZE)
+    blocks_per_shard = max(1, -(-n_blocks // (max_workers * shards_per_worker)))
+    shard_size = blocks_per_shard * BLOCK_SIZE
+    shards = [slice(start, min(start + shard_size, n_paths)) for start in range(0, n_paths, shard_size)]
+
+    market = dict(s0=s0, mu=mu, sigma=sigma, cashflows=cashflows, vol_1y=vol_1y, vol_5y=vol_5y)
+    shape = (len(STRATEGIES), len(METRICS), n_paths)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(float).itemsize)
+    try:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(shards))) as pool:
+            futures = [pool.submit(_run_shard, shm.name, n_paths, paths, gv, market) for paths in shards]
+            static = [f.result() for f in futures][0]
+
+        metrics = np.ndarray(shape, dtype=float, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return {
+        strategy: {**static[strategy], **{m: metrics[i, j] for j, m in enumerate(METRICS)}}
+        for i, strategy in enumerate(STRATEGIES)
+    }
@@ -0,0 +1,137 @@
+# Simulated Path Store Module
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import _atomic_save
+from src.fx_simulator import simulate_gbm_paths
+
+_LAYOUT_ONLY = ('out', 'block_elements')              # simulate_gbm_paths arguments that do not change the paths
+
+class PathStore:
+    """
+    Content-addressed on-disk store of simulate_gbm_paths outputs.
+
+    Entries are keyed by a hash of the parameters that determine the paths (s0, mu, sigma, dates, seed, ...)
+    and written once as .npy; later runs and parallel workers reopen them memory-mapped (read-only,
+    zero-copy). Least recently used entries are evicted once the store exceeds max_bytes.
+    Unseeded runs are not reproducible, so they are simulated but never stored.
+    """
+
+    def __init__(
+        self,
+        root: str = '.cache/paths',
+        max_bytes: int = 8 * 2**30,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+
+    @staticmethod
+    def key(**params) -> str:
+        """
+        Hash of the simulate_gbm_paths arguments that determine the paths (floats by repr, dates as ISO
+        strings, dtypes by np.dtype().str). Arguments are bound to the signature with defaults applied first,
+        so omitting a default and passing it explicitly give the same key. Arguments that leave the paths
+        unchanged are not hashed: out and block_elements (memory layout only, same draws), and
+        seed_compatible without sample_dates.
+        """
+        def _canonical(v):
+            if isinstance(v, np.dtype) or (isinstance(v, type) and issubclass(v, np.generic)):
+                return np.dtype(v).str
+            if isinstance(v, (pd.Timestamp, np.datetime64)):
+                return pd.Timestamp(v).isoformat()
+            if isinstance(v, (pd.DatetimeIndex, list, tuple, np.ndarray)):
+                return [_canonical(x) for x in (pd.DatetimeIndex(v) if not isinstance(v, (list, tuple)) else v)]
+            if isinstance(v, (float, np.floating)):
+                return repr(float(v))
+            if isinstance(v, (np.integer,)):
+                return int(v)
+            return v
+
+        bound = inspect.signature(simulate_gbm_paths).bind(**params)
+        bound.apply_defaults()
+        params = {k: v for k, v in bound.arguments.items() if k not in _LAYOUT_ONLY}
+        if params['sample_dates'] is None:
+            params['seed_compatible'] = False
+        params['scheme'] = params['scheme'].lower()
+        params['start'], params['end'] = pd.Timestamp(params['start']), pd.Timestamp(params['end'])
+        params['dtype'] = np.dtype(params['dtype'])
+        payload = json.dumps({k: _canonical(v) for k, v in sorted(params.items())}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _paths(
+        self,
+        key: str
+    ) -> tuple[Path, Path]:
+        return self.root / f'{key}.paths.npy', self.root / f'{key}.dates.npy'
+
+    def get(
+        self,
+        key: str
+    ) -> Optional[tuple[pd.DatetimeIndex, np.ndarray]]:
+        paths_file, dates_file = self._paths(key)
+        if not (paths_file.exists() and dates_file.exists()):
+            return None
+        os.utime(paths_file)                                    # LRU: access time = mtime
+        return pd.DatetimeIndex(np.load(dates_file)), np.load(paths_file, mmap_mode='r')
+
+    def put(
+        self,
+        key: str,
+        dates: pd.DatetimeIndex,
+        paths: np.ndarray
+    ) -> tuple[pd.DatetimeIndex, np.ndarray]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        paths_file, dates_file = self._paths(key)
+        for target, array in ((dates_file, pd.DatetimeIndex(dates).to_numpy()), (paths_file, np.asarray(paths))):
+            _atomic_save(target, lambda f: np.save(f, array))
+        self.evict(keep=key)
+        return self.get(key)
+
+    def evict(
+        self,
+        keep: Optional[str] = None
+    ) -> None:
+        """
+        Removes least recently used entries until the store fits in max_bytes (never `keep`).
+        """
+        if not self.root.exists():
+            return
+        entries = sorted(self.root.glob('*.paths.npy'), key=lambda p: p.stat().st_mtime_ns)
+        total = sum(p.stat().st_size for p in self.root.glob('*.npy'))
+        for paths_file in entries:
+            if total <= self.max_bytes:
+                break
+            key = paths_file.name.split('.')[0]
+            if key == keep:
+                continue
+            for f in self._paths(key):
+                if f.exists():
+                    total -= f.stat().st_size
+                    f.unlink()
+
+    def simulate(
+        self,
+        **params
+    ) -> tuple[pd.DatetimeIndex, np.ndarray]:
+        """
+        simulate_gbm_paths(**params), served from the store when the same parameters were simulated before.
+        Runs writing into a caller buffer (out=...) bypass the store.
+        """
+        if params.get('out') is not None:
+            return simulate_gbm_paths(**params)
+        if params.get('seed') is None or not isinstance(params['seed'], (int, np.integer)):
+            return simulate_gbm_paths(**params)
+
+        key = self.key(**params)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        dates, paths = simulate_gbm_paths(**params)
+        return self.put(key, dates, paths)
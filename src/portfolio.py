@@ -0,0 +1,237 @@
+# Loan Portfolio Module
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.metrics.performance import irr_batch
+from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+from src.schedule import Schedule
+from src.strategies import STRATEGY_REGISTRY, _strategy_metrics
+
+CURRENCIES = ('EUR', 'USD')             # One EURUSD simulation drives the book; USD loans carry no FX risk
+
+@dataclass(frozen=True)
+class Portfolio:
+    """
+    A book of loans on the union of their cashflow dates: padded (n_loans, n_dates) amount matrices, one per
+    currency, zero where a loan has no cashflow. Everything that depends on the FX path is computed per
+    unique date, so simulation and hedging cost grows with n_dates, not n_loans x n_paths.
+    """
+    loan_ids: np.ndarray
+    dates: pd.DatetimeIndex
+    amounts: dict
+
+    @classmethod
+    def from_frame(
+            cls,
+            cashflows: pd.DataFrame
+    ) -> 'Portfolio':
+        """
+        From a long frame indexed by cashflow date with columns loan_id, cf (amount in the loan currency) and
+        optionally currency (default 'EUR'), i.e. stacked cashflows_loader outputs with a loan_id column.
+        """
+        df = cashflows.reset_index().rename(columns={cashflows.index.name or 'index': 'date'})
+        if 'currency' not in df:
+            df['currency'] = 'EUR'
+        df['currency'] = df['currency'].str.upper()
+        unknown = set(df['currency']) - set(CURRENCIES)
+        if unknown:
+            raise ValueError(f'Unsupported currencies {sorted(unknown)}; supported: {CURRENCIES}')
+
+        loan_ids, loan_pos = np.unique(df['loan_id'].to_numpy(), return_inverse=True)
+        dates = pd.DatetimeIndex(sorted(pd.DatetimeIndex(df['date']).unique()))
+        date_pos = dates.get_indexer(pd.DatetimeIndex(df['date']))
+
+        amounts = {}
+        for currency in CURRENCIES:
+            mask = (df['currency'] == currency).to_numpy()
+            matrix = np.zeros((loan_ids.size, dates.size), dtype=float)
+            np.add.at(matrix, (loan_pos[mask], date_pos[mask]), df['cf'].to_numpy(dtype=float)[mask])
+            amounts[currency] = matrix
+        return cls(loan_ids=loan_ids, dates=dates, amounts=amounts)
+
+    @classmethod
+    def from_loans(
+            cls,
+            loans: dict
+    ) -> 'Portfolio':
+        """
+        From {loan_id: cashflows_loader-style frame (date index, cf_eur column)}.
+        """
+        frames = [
+            pd.DataFrame({'loan_id': loan_id, 'cf': df['cf_eur'].to_numpy(), 'currency': 'EUR'}, index=pd.DatetimeIndex(df.index))
+            for loan_id, df in loans.items()
+        ]
+        frame = pd.concat(frames)
+        frame.index.rename('date', inplace=True)
+        return cls.from_frame(frame)
+
+def evaluate_portfolio(
+        portfolio: Portfolio,
+        spot_samples: np.ndarray,
+        path_dates: pd.DatetimeIndex,
+        s0: float,
+        vol_1y: float,
+        vol_5y: float,
+        global_variables: GlobalVariables,
+        strategies: tuple[str, ...] = ('unhedged', 'forward', 'option'),
+        loan_block: int = 256,
+        loan_irr: bool = True
+) -> dict:
+    """
+    Evaluation of a whole book under registered strategies (STRATEGY_REGISTRY) on one shared FX simulation
+    (ideally simulated with sample_dates=portfolio.dates).
+
+    Per unique date and strategy we build the USD value of one EUR of inflow (the spot plus the strategy's
+    hedge payoff per EUR, see _unit_hedge) and the upfront premium per EUR of inflow; outflows and unhedged
+    flows convert at the spot. gv.premium, a per-deal charge, is not applied. Since every loan cashflow is
+    amount x rate, portfolio and loan cashflows are matrix products of these (n_paths, n_dates) rates with
+    the amount matrices.
+
+    Returns:
+      - 'aggregate': {strategy: performance dict (irr, moic, npv, terminal arrays + premium)} for the book,
+      - 'loans': {strategy: DataFrame per loan of risk_report stats for npv / moic / terminal (and irr if
+        loan_irr: one root per loan per path, the dominant cost for large books), premium},
+        computed loan_block loans at a time.
+    """
+    gv = global_variables
+    unknown = [s for s in strategies if s not in STRATEGY_REGISTRY]
+    if unknown:
+        raise ValueError(f'Unknown strategies {unknown}; registered: {list(STRATEGY_REGISTRY)}')
+
+    eur, usd = portfolio.amounts['EUR'], portfolio.amounts['USD']
+    eur_in, eur_out = np.maximum(eur, 0.0), np.minimum(eur, 0.0)
+
+    frame = pd.DataFrame({'cf_eur': eur.sum(axis=0)}, index=portfolio.dates)
+    schedule = Schedule.from_global_variables(cashflows=frame, path_dates=path_dates, s0=s0, global_variables=gv)
+    spots = spot_samples[:, schedule.grid_idx]
+    n_paths, n_dates = spots.shape
+    context = dict(
+        cashflow_dates=schedule.cashflow_dates,
+        grid_dates=pd.DatetimeIndex(path_dates)[schedule.grid_idx],
+        s0=s0,
+        vol_1y=vol_1y,
+        vol_5y=vol_5y,
+        global_variables=replace(gv, premium=0.0),
+        schedule=_gathered(schedule))
+
+    upfront = schedule.with_upfront()
+    aggregate, loans = {}, {}
+    for strategy in strategies:
+        payoff, premia, info = _unit_hedge(strategy, spots, context)
+        rates_in = spots + payoff
+        premium = float(eur_in.sum(axis=0) @ premia)
+        cashflows_usd = np.empty((n_paths, 1 + n_dates), dtype=float)
+        cashflows_usd[:, 0] = -premium
+        cashflows_usd[:, 1:] = rates_in * eur_in.sum(axis=0) + spots * eur_out.sum(axis=0) + usd.sum(axis=0)
+        aggregate[strategy] = {
+            'strategy': info.get('strategy', strategy),
+            **_strategy_metrics(schedule=upfront, cashflows_usd=cashflows_usd),
+            'premium': premium}
+        loans[strategy] = _loan_summaries(
+            portfolio=portfolio, rates_in=rates_in, spots=spots, premia=premia,
+            upfront=upfront, alpha=gv.alpha, loan_block=loan_block, loan_irr=loan_irr)
+
+    return {'aggregate': aggregate, 'loans': loans}
+
+def _unit_hedge(
+        strategy: str,
+        spots: np.ndarray,
+        context: dict
+) -> tuple[np.ndarray, np.ndarray, dict]:
+    """
+    (hedge payoff USD per EUR of inflow (n_paths, n_dates), upfront premium USD per EUR of inflow (n_dates,),
+    plugin info) for a registered strategy.
+
+    Plugins hedge each positive cashflow_eur in proportion to its notional (as the built-in ones do), so one
+    call on unit inflows gives the payoffs, and premia (priced at s0, path-independent) come from one call
+    per date on a single path.
+    """
+    plugin = STRATEGY_REGISTRY[strategy]
+    n_dates = spots.shape[1]
+    payoff, _, info = plugin(spots, {**context, 'cashflow_eur': np.ones(n_dates)})
+    premia = np.array([plugin(spots[:1], {**context, 'cashflow_eur': e})[1] for e in np.eye(n_dates)], dtype=float)
+    return payoff, premia, info
+
+def _gathered(
+        schedule: Schedule
+) -> Schedule:
+    return replace(schedule, grid_idx=np.arange(schedule.grid_idx.size))
+
+def _loan_summaries(
+        portfolio: Portfolio,
+        rates_in: np.ndarray,
+        spots: np.ndarray,
+        premia: np.ndarray,
+        upfront: Schedule,
+        alpha: float,
+        loan_block: int,
+        loan_irr: bool = True
+) -> pd.DataFrame:
+    """
+    Per-loan NPV / MOIC / terminal (/ IRR) risk stats. For a block of loans, NPV and terminal value are
+    (n_paths, n_dates) @ (n_dates, block) products; MOIC only needs the inflow and outflow sums, which are
+    products too since each side's sign is fixed by the loan's amount (rates and spots are positive).
+    MOIC is NaN on paths without outflows, as in moic_batch. IRR needs each loan's full cashflow rows,
+    built ~2^22 elements at a time for irr_batch on the book's date grid (leading zeros leave IRR unchanged).
+    """
+    eur, usd = portfolio.amounts['EUR'], portfolio.amounts['USD']
+    discount = upfront.discount_factors[1:]
+    n_paths, n_dates = spots.shape
+    rows = []
+
+    for start in range(0, portfolio.loan_ids.size, loan_block):
+        block = slice(start, start + loan_block)
+        a_in, a_out = np.maximum(eur[block], 0.0), np.minimum(eur[block], 0.0)
+        u_in, u_out = np.maximum(usd[block], 0.0), np.minimum(usd[block], 0.0)
+        premium = a_in @ premia
+
+        inflows = rates_in @ a_in.T + u_in.sum(axis=1)
+        outflows = -(spots @ a_out.T + u_out.sum(axis=1)) + premium
+        npv = (rates_in * discount) @ a_in.T + (spots * discount) @ a_out.T + (usd[block] @ discount) - premium
+
+        metrics = {
+            'npv': npv,
+            'moic': np.divide(inflows, outflows, out=np.full_like(inflows, np.nan), where=outflows > 0),
+            'terminal': inflows - outflows,
+        }
+        if loan_irr:
+            metrics['irr'] = _loan_irr(rates_in, spots, a_in, a_out, usd[block], premium, upfront)
+        reports = {m: risk_report(x, alpha=alpha, loss_modes=(METRIC_LOSS_MODES[m],)) for m, x in metrics.items()}
+        for j, loan_id in enumerate(portfolio.loan_ids[block]):
+            row = {'loan_id': loan_id, 'premium': float(premium[j])}
+            for m, report in reports.items():
+                row.update({f'{m}_{stat}': value for stat, value in report[j].items() if stat != 'n'})
+            rows.append(row)
+
+    return pd.DataFrame(rows).set_index('loan_id')
+
+def _loan_irr(
+        rates_in: np.ndarray,
+        spots: np.ndarray,
+        a_in: np.ndarray,
+        a_out: np.ndarray,
+        usd: np.ndarray,
+        premium: np.ndarray,
+        upfront: Schedule,
+        max_elements: int = 2**22
+) -> np.ndarray:
+    """
+    (n_paths, n_loans) IRR of each loan's USD cashflows (premium upfront on the analysis date).
+    """
+    n_paths, n_dates = spots.shape
+    n_loans = a_in.shape[0]
+    out = np.empty((n_paths, n_loans), dtype=float)
+    step = max(1, max_elements // (n_paths * (1 + n_dates)))
+    for j in range(0, n_loans, step):
+        loans = slice(j, j + step)
+        cashflows_usd = np.empty((len(range(n_loans)[loans]), n_paths, 1 + n_dates), dtype=float)
+        cashflows_usd[:, :, 0] = -premium[loans, None]
+        cashflows_usd[:, :, 1:] = (rates_in * a_in[loans, None, :] + spots * a_out[loans, None, :]) + usd[loans, None, :]
+        out[:, loans] = irr_batch(
+            cashflow_dates=upfront.cashflow_dates,
+            cashflows_matrix=cashflows_usd.reshape(-1, 1 + n_dates),
+            schedule=upfront).reshape(-1, n_paths).T
+    return out
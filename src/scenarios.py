@@ -0,0 +1,111 @@
+# Hedge Scenario Grid Module
+from dataclasses import replace
+from itertools import product
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.schedule import Schedule
+from src.strategies import METRICS, _strategy_metrics
+from src.hedges.forwards import forward_hedge_cashflows_usd
+from src.hedges.options import put_option_hedge_cashflows_usd
+from src.hedges.vol_surface import VolSurface
+from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+
+def scenario_grid(
+        spots: np.ndarray,
+        path_dates: pd.DatetimeIndex,
+        cashflows: pd.DataFrame,
+        s0: float,
+        vol_1y: float,
+        vol_5y: float,
+        global_variables: GlobalVariables,
+        hedge_ratios: tuple[float, ...] = (0.0, 0.25, 0.5, 0.75, 1.0),
+        moneyness: tuple[float, ...] = (1.0,),
+        forward_weights: tuple[float, ...] = (0.0, 1.0),
+        vol_surface: Optional[VolSurface] = None,
+) -> dict:
+    """
+    Evaluates every (hedge_ratio, moneyness, forward_weight) combination on one set of simulated spots.
+
+    A scenario hedges hedge_ratio of each incoming EUR cashflow, forward_weight of it with forwards and the
+    rest with puts struck at moneyness x F(0, T). Hedge payoffs and premia are linear in the notional, so the
+    unit forward payoff and one unit put payoff per moneyness are computed once (on spots gathered once at
+    the cashflow dates) and scaled per scenario. Option premium is paid on the analysis date; a zero premium
+    column leaves IRR/MOIC/NPV/terminal unchanged, so all scenarios share one date grid.
+
+    Fixed premium convention: the notebook (and the unhedged / forward plugins) deduct gv.premium in full
+    from the first loan cashflow of the unhedged and forward strategies, whatever the hedge ratio, and the
+    put strategy pays none. A scenario mixes these, so it is charged
+        fixed_premium = gv.premium x (hedge_ratio x forward_weight + 1 - hedge_ratio),
+    i.e. gv.premium times the share of the notional not hedged with puts. This equals the notebook charge
+    for hedge_ratio = 0 (unhedged), forward_weight = 1 (forward, any hedge ratio) and hedge_ratio = 1 with
+    forward_weight = 0 (fully put-hedged). Partial put hedges (hedge_ratio < 1, forward_weight < 1), which the
+    notebook has no strategy for, pay the unhedged remainder's share where the option plugin pays nothing.
+
+    vol_surface: price each moneyness at its smile vol (see put_option_hedge_cashflows_usd).
+
+    Returns:
+      - 'scenarios': DataFrame of the grid (hedge_ratio, moneyness, forward_weight, premium, fixed_premium)
+        per scenario, premium being the upfront option premium,
+      - 'metrics': {metric: (n_scenarios, n_paths) array},
+      - 'risk': {metric: DataFrame (n_scenarios x risk_report stats)}.
+    """
+    gv = global_variables
+    schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=path_dates, s0=s0, global_variables=gv)
+    cashflow_eur = schedule.cashflow_eur
+
+    # Cashflow-date spots, gathered once
+    spots_cf = spots[:, schedule.grid_idx]
+    hedge = dict(
+        spot_paths=spots_cf,
+        path_dates=pd.DatetimeIndex(path_dates)[schedule.grid_idx],
+        cashflow_dates=schedule.cashflow_dates,
+        cashflow_eur=cashflow_eur,
+        s0=s0,
+        r_domestic=gv.r_domestic,
+        r_foreign=gv.r_foreign,
+        hedge_ratio=1.0,
+        start_date=gv.analysis_start_date,
+        schedule=replace(schedule, grid_idx=np.arange(schedule.grid_idx.size)))
+
+    # Unit (hedge_ratio = 1) payoffs
+    base_usd = cashflow_eur * spots_cf
+    forward_unit, _ = forward_hedge_cashflows_usd(**hedge)
+    put_units = {}
+    for m in moneyness:
+        put_payoff, put_premium, _, _ = put_option_hedge_cashflows_usd(**hedge, vol_1y=vol_1y, vol_5y=vol_5y, moneyness=m, vol_surface=vol_surface)
+        put_units[m] = (put_payoff, put_premium)
+
+    scenarios = pd.DataFrame(
+        list(product(hedge_ratios, moneyness, forward_weights)),
+        columns=['hedge_ratio', 'moneyness', 'forward_weight'])
+    scenarios['premium'] = [
+        h * (1.0 - w) * put_units[m][1]
+        for h, m, w in scenarios[['hedge_ratio', 'moneyness', 'forward_weight']].itertuples(index=False)]
+    scenarios['fixed_premium'] = gv.premium * (scenarios['hedge_ratio'] * scenarios['forward_weight'] + 1.0 - scenarios['hedge_ratio'])
+    scenarios.index.rename('scenario', inplace=True)
+
+    # Premium column on the analysis date, then the loan cashflow dates
+    upfront = schedule.with_upfront()
+    n_paths = spots.shape[0]
+    metrics = {m: np.empty((len(scenarios), n_paths), dtype=float) for m in METRICS}
+    cashflows_usd = np.empty((n_paths, upfront.cashflow_dates.size), dtype=float)
+
+    for i, (h, m, w, premium, fixed_premium) in enumerate(scenarios.itertuples(index=False)):
+        cashflows_usd[:, 0] = -premium
+        cashflows_usd[:, 1:] = base_usd + h * (w * forward_unit + (1.0 - w) * put_units[m][0])
+        cashflows_usd[:, 1] -= fixed_premium            # See the fixed premium convention above
+        results = _strategy_metrics(schedule=upfront, cashflows_usd=cashflows_usd)
+        for metric in METRICS:
+            metrics[metric][i] = results[metric]
+
+    risk = {
+        metric: pd.DataFrame(
+            risk_report(metrics[metric].T, alpha=gv.alpha, loss_modes=(METRIC_LOSS_MODES[metric],)),
+            index=scenarios.index)
+        for metric in METRICS
+    }
+    return {'scenarios': scenarios, 'metrics': metrics, 'risk': risk}
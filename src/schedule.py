@@ -0,0 +1,105 @@
+# Cashflow Schedule Module
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.metrics.performance import _yearfracs
+
+def _frozen(
+        x: np.ndarray
+) -> np.ndarray:
+    x = np.array(x)
+    x.flags.writeable = False
+    return x
+
+@dataclass(frozen=True)
+class Schedule:
+    """
+    All date-derived quantities of a cashflow schedule, computed once as (read-only) NumPy arrays:
+
+      - grid_idx           : position of each cashflow date on the simulation calendar ('pad' lookup)
+      - year_fractions     : actual/365 from start_date (NPV, forwards, option tenors)
+      - irr_year_fractions : actual/365 from the first cashflow date (IRR convention in the notebook)
+      - discount_factors   : (1 + discount_rate)^-year_fractions
+      - forwards           : s0 exp((r_domestic - r_foreign) year_fractions), as _forward_rates
+
+    Hedge and metric functions accept it via schedule=..., skipping their per-call pandas date work.
+    """
+    cashflow_dates: pd.DatetimeIndex
+    cashflow_eur: np.ndarray
+    start_date: pd.Timestamp
+    s0: float
+    grid_idx: np.ndarray
+    year_fractions: np.ndarray
+    irr_year_fractions: np.ndarray
+    discount_rate: float
+    discount_factors: np.ndarray
+    forwards: np.ndarray
+
+    @classmethod
+    def build(
+            cls,
+            cashflows: pd.DataFrame,
+            path_dates: pd.DatetimeIndex,
+            s0: float,
+            r_domestic: float,
+            r_foreign: float,
+            discount_rate: float,
+            start_date: pd.Timestamp = pd.Timestamp('2025-08-01')
+    ) -> 'Schedule':
+        """
+        From cashflows_loader output and the simulation calendar (full grid or sample_dates columns).
+        """
+        cashflow_dates = pd.DatetimeIndex(cashflows.index)
+        grid_idx = pd.DatetimeIndex(path_dates).get_indexer(cashflow_dates, method='pad')
+        if (grid_idx < 0).any():
+            missing = cashflow_dates[grid_idx < 0]
+            raise ValueError(f'Cashflow dates before simulation begins: {missing}')
+
+        year_fractions = _yearfracs(start_date=start_date, dates=cashflow_dates)
+        return cls(
+            cashflow_dates=cashflow_dates,
+            cashflow_eur=_frozen(np.asarray(cashflows['cf_eur'], dtype=float)),
+            start_date=pd.Timestamp(start_date),
+            s0=float(s0),
+            grid_idx=_frozen(grid_idx),
+            year_fractions=_frozen(year_fractions),
+            irr_year_fractions=_frozen(_yearfracs(start_date=cashflow_dates[0], dates=cashflow_dates)),
+            discount_rate=float(discount_rate),
+            discount_factors=_frozen((1 + discount_rate) ** -year_fractions),
+            forwards=_frozen(s0 * np.exp((r_domestic - r_foreign) * year_fractions)))
+
+    @classmethod
+    def from_global_variables(
+            cls,
+            cashflows: pd.DataFrame,
+            path_dates: pd.DatetimeIndex,
+            s0: float,
+            global_variables: GlobalVariables
+    ) -> 'Schedule':
+        gv = global_variables
+        return cls.build(
+            cashflows=cashflows,
+            path_dates=path_dates,
+            s0=s0,
+            r_domestic=gv.r_domestic,
+            r_foreign=gv.r_foreign,
+            discount_rate=gv.discount_rate,
+            start_date=gv.analysis_start_date)
+
+    def with_upfront(self) -> 'Schedule':
+        """
+        Schedule with start_date prepended as a zero EUR cashflow (where an upfront USD premium is paid).
+        The new entry is not a simulated date: its grid_idx is -1. IRR then runs from start_date.
+        """
+        return replace(
+            self,
+            cashflow_dates=self.cashflow_dates.insert(0, self.start_date),
+            cashflow_eur=_frozen(np.concatenate([[0.0], self.cashflow_eur])),
+            grid_idx=_frozen(np.concatenate([[-1], self.grid_idx])),
+            year_fractions=_frozen(np.concatenate([[0.0], self.year_fractions])),
+            irr_year_fractions=_frozen(np.concatenate([[0.0], self.year_fractions])),
+            discount_factors=_frozen(np.concatenate([[1.0], self.discount_factors])),
+            forwards=_frozen(np.concatenate([[self.s0], self.forwards])))
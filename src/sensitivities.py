@@ -0,0 +1,101 @@
+# Risk Sensitivities Module
+from dataclasses import replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.fx_simulator import _sample_index, simulate_gbm_paths
+from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+from src.strategies import evaluate_strategies
+
+PARAMETERS = ('s0', 'sigma', 'vol', 'r_domestic', 'r_foreign')
+
+# Absolute central-difference bump sizes ('vol' shifts the 1y and 5y implied ATM vols in parallel)
+DEFAULT_BUMPS = {'s0': 0.01, 'sigma': 0.01, 'vol': 0.01, 'r_domestic': 0.0001, 'r_foreign': 0.0001}
+
+def _spots_from_brownian(
+        brownian: np.ndarray,
+        times: np.ndarray,
+        s0: float,
+        mu: float,
+        sigma: float
+) -> np.ndarray:
+    """
+    GBM spots s0 exp((mu - sigma^2 / 2) t + sigma W_t) on the standard Brownian paths W (valid for sigma = 0).
+    """
+    return s0 * np.exp((mu - 0.5 * sigma ** 2) * times + sigma * brownian)
+
+def risk_sensitivities(
+        global_variables: GlobalVariables,
+        s0: float,
+        mu: float,
+        sigma: float,
+        cashflows: pd.DataFrame,
+        vol_1y: float,
+        vol_5y: float,
+        parameters: tuple[str, ...] = PARAMETERS,
+        bumps: Optional[dict] = None,
+        strategies: tuple[str, ...] = ('unhedged', 'forward', 'option')
+) -> pd.DataFrame:
+    """
+    Central-difference sensitivities of NPV mean, p05 and ES (risk_report, npv_shortfall loss) to s0, the
+    simulation sigma, the implied vols used to price the puts and the two rates, for every strategy.
+
+    Common random numbers: the standard Brownian motion W driving the paths is simulated once
+    (global_variables.n_paths, seed, on the cashflow dates only; the same draws simulate_gbm_paths uses for
+    that seed) and every scenario builds its spots from it in closed form, so sigma = 0 is handled too.
+    Vol and rate bumps keep the paths as they are, and each scenario only re-runs the hedges and NPV
+    (no IRR), so the cost is one simulation plus 1 + 2 x len(parameters) cheap evaluations. Without a
+    seed the draws are still common to all scenarios, just not reproducible.
+
+    The s0 bump moves the spot paths only: forwards, put strikes and premia stay those struck at the base
+    s0, so the s0 column is the delta of the hedged position as traded, not of re-striking the hedges.
+
+    Returns a DataFrame indexed by (strategy, stat) with the base value and d stat / d parameter per unit.
+    """
+    gv = global_variables
+    bumps = {**DEFAULT_BUMPS, **(bumps or {})}
+    unknown = [p for p in parameters if p not in PARAMETERS]
+    if unknown:
+        raise ValueError(f'Unknown parameters {unknown}; supported: {PARAMETERS}')
+
+    start = gv.analysis_start_date
+    # With s0 = 1, mu = 1/2, sigma = 1 the log spots are exactly W_t
+    path_dates, brownian = simulate_gbm_paths(
+        s0=1.0, mu=0.5, sigma=1.0, start=start, end=cashflows.index.max(), n_paths=gv.n_paths,
+        steps_per_year=gv.steps_per_year, seed=gv.seed, sample_dates=pd.DatetimeIndex(cashflows.index))
+    np.log(brownian, out=brownian)
+    grid = pd.bdate_range(start=start, end=path_dates.max())
+    times = _sample_index(dates=grid, sample_dates=path_dates) / gv.steps_per_year
+
+    loss = METRIC_LOSS_MODES['npv']
+    label = int(gv.alpha * 100)
+    stats = ('mean', 'p05', f'ES{label}_loss')
+
+    def _stats(scenario: dict) -> np.ndarray:
+        scenario_spots = _spots_from_brownian(
+            brownian, times, scenario.get('s0', s0), mu, scenario.get('sigma', sigma))
+        rates = {k: v for k, v in scenario.items() if k in ('r_domestic', 'r_foreign')}
+        shift = scenario.get('vol', 0.0)
+
+        # Hedges struck at the base s0 whatever the scenario's spot
+        performance = evaluate_strategies(
+            spot_samples=scenario_spots, path_dates=path_dates, cashflows=cashflows, s0=s0,
+            vol_1y=vol_1y + shift, vol_5y=vol_5y + shift, global_variables=replace(gv, **rates),
+            strategies=strategies, metrics=('npv',))
+        reports = risk_report(
+            np.column_stack([performance[name]['npv'] for name in strategies]), alpha=gv.alpha, loss_modes=(loss,))
+        return np.array([[report[stat] for stat in stats] for report in reports])
+
+    base = {'s0': s0, 'sigma': sigma, 'vol': 0.0, 'r_domestic': gv.r_domestic, 'r_foreign': gv.r_foreign}
+    table = {'base': _stats({}).ravel()}
+    for parameter in parameters:
+        h = bumps[parameter]
+        up = _stats({parameter: base[parameter] + h})
+        down = _stats({parameter: base[parameter] - h})
+        table[parameter] = ((up - down) / (2 * h)).ravel()
+
+    index = pd.MultiIndex.from_product([strategies, stats], names=['strategy', 'stat'])
+    return pd.DataFrame(table, index=index)
@@ -0,0 +1,176 @@
+# Strategy Evaluation Module
+from dataclasses import replace
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.global_variables import GlobalVariables
+from src.hedges.forwards import forward_hedge_cashflows_usd
+from src.hedges.options import put_option_hedge_cashflows_usd
+from src.metrics.performance import irr_batch, moic_batch, npv_batch, terminal_value_batch
+from src.schedule import Schedule
+
+METRICS = ('irr', 'moic', 'npv', 'terminal')
+
+# name -> plugin(spots_cf, context) -> (hedge cashflows USD (n_paths, n_cashflows), upfront premium USD, info)
+STRATEGY_REGISTRY: dict[str, Callable] = {}
+
+def register_strategy(
+        name: str
+) -> Callable:
+    """
+    Decorator adding a hedge strategy plugin to STRATEGY_REGISTRY.
+
+    A plugin receives the spots at the cashflow dates (n_paths, n_cashflows) and the evaluation context
+    (cashflow_dates, grid_dates, cashflow_eur, s0, vol_1y, vol_5y, global_variables, schedule) and returns the hedge
+    USD cashflows on the loan dates, the USD premium paid upfront on the analysis date, and a dict of
+    path-independent info (strategy label, premium, forwards, strikes, ...) reported alongside the metrics.
+    """
+    def _register(plugin: Callable) -> Callable:
+        STRATEGY_REGISTRY[name] = plugin
+        return plugin
+    return _register
+
+def _hedge_kwargs(
+        spots_cf: np.ndarray,
+        context: dict
+) -> dict:
+    gv = context['global_variables']
+    return dict(
+        spot_paths=spots_cf,
+        path_dates=context['grid_dates'],
+        cashflow_dates=context['cashflow_dates'],
+        cashflow_eur=context['cashflow_eur'],
+        s0=context['s0'],
+        r_domestic=gv.r_domestic,
+        r_foreign=gv.r_foreign,
+        hedge_ratio=gv.hedging_ratio,
+        start_date=gv.analysis_start_date,
+        schedule=context['schedule'])
+
+@register_strategy('unhedged')
+def _unhedged(
+        spots_cf: np.ndarray,
+        context: dict
+) -> tuple[np.ndarray, float, dict]:
+    gv = context['global_variables']
+    hedge = np.zeros_like(spots_cf)
+    hedge[:, 0] -= gv.premium                   # Charging Premium on the first loan cashflow
+    return hedge, 0.0, {'strategy': 'unhedged', 'premium': gv.premium}
+
+@register_strategy('forward')
+def _forward(
+        spots_cf: np.ndarray,
+        context: dict
+) -> tuple[np.ndarray, float, dict]:
+    gv = context['global_variables']
+    hedge, forwards = forward_hedge_cashflows_usd(**_hedge_kwargs(spots_cf, context))
+    hedge[:, 0] -= gv.premium
+    return hedge, 0.0, {'strategy': 'forward', 'premium': gv.premium, 'forwards': forwards}
+
+@register_strategy('option')
+def _option(
+        spots_cf: np.ndarray,
+        context: dict
+) -> tuple[np.ndarray, float, dict]:
+    hedge, premium, strikes, vols_used = put_option_hedge_cashflows_usd(
+        **_hedge_kwargs(spots_cf, context),
+        vol_1y=context['vol_1y'],
+        vol_5y=context['vol_5y'])
+    return hedge, premium, {'strategy': 'option_put_atmf', 'premium': premium, 'strikes': strikes, 'vols_used': vols_used}
+
+def _strategy_metrics(
+        schedule: Schedule,
+        cashflows_usd: np.ndarray,
+        metrics: Iterable[str] = METRICS
+) -> dict:
+    """
+    IRR / MOIC / NPV / terminal value for every row of an (n_paths, n_cashflows) USD cashflow matrix on schedule.
+    Same conventions as the notebook: IRR from the first cashflow date, NPV from the schedule's start_date.
+    Only the requested metrics are computed (the IRR root search dominates the cost).
+    """
+    calculators = {
+        'irr': lambda: irr_batch(
+            cashflow_dates=schedule.cashflow_dates,
+            cashflows_matrix=cashflows_usd,
+            schedule=schedule),
+        'moic': lambda: moic_batch(cashflows_matrix=cashflows_usd),
+        'npv': lambda: npv_batch(
+            cashflows_matrix=cashflows_usd,
+            discount_factors=schedule.discount_factors),
+        'terminal': lambda: terminal_value_batch(cashflows_matrix=cashflows_usd),
+    }
+    return {m: calculators[m]() for m in metrics}
+
+def evaluate_strategies(
+        spot_samples: np.ndarray,
+        path_dates: pd.DatetimeIndex,
+        cashflows: pd.DataFrame,
+        s0: float,
+        vol_1y: float,
+        vol_5y: float,
+        global_variables: GlobalVariables,
+        strategies: Iterable[str] = ('unhedged', 'forward', 'option'),
+        schedule: Optional[Schedule] = None,
+        metrics: Iterable[str] = METRICS
+) -> dict:
+    """
+    Evaluates registered strategies on simulated spots (full grid or sample_dates columns).
+
+    Spots are gathered at the cashflow dates once. All strategies' USD cashflows are stacked into one
+    (n_strategies, n_paths, 1 + n_cashflows) tensor, column 0 being the upfront premium on the analysis
+    date (zero for strategies without one, which leaves every metric unchanged), and the metrics are
+    computed over all strategies and paths in one batched call each.
+
+    schedule: Schedule.from_global_variables(cashflows, path_dates, s0, global_variables), built here if not
+    given; pass it in to reuse across chunks.
+    metrics: subset of METRICS to compute, e.g. ('npv',) to skip the IRR root search.
+
+    Returns one performance dict per strategy (metric arrays + plugin info), like the notebook's performance_*.
+    """
+    gv = global_variables
+    strategies, metrics = tuple(strategies), tuple(metrics)
+    unknown = [s for s in strategies if s not in STRATEGY_REGISTRY]
+    if unknown:
+        raise ValueError(f'Unknown strategies {unknown}; registered: {list(STRATEGY_REGISTRY)}')
+
+    if schedule is None:
+        schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=path_dates, s0=s0, global_variables=gv)
+    cashflow_eur = schedule.cashflow_eur
+
+    # Cashflow-date spots, gathered once; the hedges then see a schedule on the gathered columns
+    spots_cf = spot_samples[:, schedule.grid_idx]
+    context = dict(
+        cashflow_dates=schedule.cashflow_dates,
+        grid_dates=pd.DatetimeIndex(path_dates)[schedule.grid_idx],
+        cashflow_eur=cashflow_eur,
+        s0=s0,
+        vol_1y=vol_1y,
+        vol_5y=vol_5y,
+        global_variables=gv,
+        schedule=replace(schedule, grid_idx=np.arange(schedule.grid_idx.size)))
+
+    n_paths, n_cashflows = spots_cf.shape
+    cashflows_usd = np.empty((len(strategies), n_paths, 1 + n_cashflows), dtype=float)
+    cashflows_usd[:, :, 1:] = cashflow_eur * spots_cf
+    infos = []
+    for i, name in enumerate(strategies):
+        hedge, premium, info = STRATEGY_REGISTRY[name](spots_cf, context)
+        cashflows_usd[i, :, 0] = -premium
+        cashflows_usd[i, :, 1:] += hedge
+        infos.append(info)
+
+    values = _strategy_metrics(
+        schedule=schedule.with_upfront(),
+        cashflows_usd=cashflows_usd.reshape(-1, 1 + n_cashflows),
+        metrics=metrics)
+
+    return {
+        name: {
+            'strategy': info.pop('strategy', name),
+            **{m: values[m].reshape(len(strategies), n_paths)[i] for m in metrics},
+            **info,
+        }
+        for i, (name, info) in enumerate(zip(strategies, infos))
+    }
@@ -0,0 +1,61 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import cashflows_loader
+from src.fx_simulator import simulate_gbm_paths
+from src.global_variables import GlobalVariables
+from src.strategies import METRICS
+
+S0, MU, SIGMA, VOL_1Y, VOL_5Y = 1.17, 0.0, 0.08, 0.072, 0.080
+
+def synthetic_market_data(
+        start: str = '2022-01-03',
+        end: str = '2025-09-30',
+        seed: int = 0
+) -> pd.DataFrame:
+    """
+    market_data_loader-style frame: GBM spot bid / mid / ask and 1y / 5y ATM vol quotes (in %) on business days.
+    Same seed and start give the same rows whatever the end date, so longer frames extend shorter ones.
+    """
+    dates = pd.bdate_range(start=start, end=end, name='dates')
+    rng = np.random.default_rng(seed)
+    mid = S0 * np.exp(np.cumsum(rng.normal(0.0, SIGMA / np.sqrt(252), size=(len(pd.bdate_range(start, '2035-12-31')),))))
+    mid = mid[:len(dates)]
+    vol_1y = 100 * VOL_1Y + np.sin(np.arange(len(dates)) / 50.0)
+    return pd.DataFrame({
+        'spot_bid': mid - 1e-4, 'spot_mid': mid, 'spot_ask': mid + 1e-4,
+        '1y_atm_vol_bid': vol_1y - 0.1, '1y_atm_vol_mid': vol_1y, '1y_atm_vol_ask': vol_1y + 0.1,
+        '5y_atm_vol_bid': vol_1y + 0.7, '5y_atm_vol_mid': vol_1y + 0.8, '5y_atm_vol_ask': vol_1y + 0.9,
+    }, index=dates)
+
+@pytest.fixture
+def cashflows() -> pd.DataFrame:
+    return cashflows_loader()
+
+@pytest.fixture
+def global_variables() -> GlobalVariables:
+    return GlobalVariables(n_paths=3000, seed=7, chunk_size=1000, premium=1e5, hedging_ratio=0.7, cache_dir=None)
+
+@pytest.fixture
+def paths(cashflows, global_variables) -> tuple[pd.DatetimeIndex, np.ndarray]:
+    gv = global_variables
+    return simulate_gbm_paths(
+        s0=S0, mu=MU, sigma=SIGMA, start=gv.analysis_start_date, end=cashflows.index.max(),
+        n_paths=500, steps_per_year=gv.steps_per_year, seed=3)
+
+def run_strategies(runner, global_variables, cashflows, **kwargs) -> dict:
+    """
+    runner(global_variables, S0, MU, SIGMA, cashflows, VOL_1Y, VOL_5Y) (run_chunked, run_parallel, ...), IRR warnings off.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return runner(global_variables, S0, MU, SIGMA, cashflows, VOL_1Y, VOL_5Y, **kwargs)
+
+def assert_same_metrics(a: dict, b: dict) -> None:
+    assert a.keys() == b.keys()
+    for strategy in a:
+        for metric in METRICS:
+            np.testing.assert_array_equal(a[strategy][metric], b[strategy][metric])
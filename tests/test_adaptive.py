@@ -0,0 +1,29 @@
+from dataclasses import replace
+
+import numpy as np
+
+from src.adaptive import adaptive_run
+from src.engine import run_chunked
+from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+from tests.conftest import run_strategies
+
+def _adaptive(global_variables, cashflows, tolerances, max_paths):
+    return run_strategies(adaptive_run, global_variables, cashflows, tolerances=tolerances, max_paths=max_paths,
+                          min_paths=2000, n_batches=10)
+
+def test_adaptive_run_stops_once_converged_on_a_prefix_of_the_paths(global_variables, cashflows):
+    gv = replace(global_variables, chunk_size=1000)
+    result = _adaptive(gv, cashflows, {('unhedged', 'npv', 'mean'): 1e6}, max_paths=20_000)
+    assert result['converged']
+    assert result['n_paths'] == 2000
+    assert result['errors'][('unhedged', 'npv', 'mean')] <= 1e6
+
+    prefix = run_strategies(run_chunked, replace(gv, n_paths=result['n_paths']), cashflows)
+    expected = risk_report(prefix['unhedged']['npv'], alpha=gv.alpha, loss_modes=(METRIC_LOSS_MODES['npv'],))[0]
+    np.testing.assert_allclose(result['estimates'][('unhedged', 'npv', 'mean')], expected['mean'], rtol=1e-12)
+
+def test_adaptive_run_reports_non_convergence_at_max_paths(global_variables, cashflows):
+    gv = replace(global_variables, chunk_size=1000)
+    result = _adaptive(gv, cashflows, {('option', 'npv', 'p05'): 1e-6}, max_paths=4000)
+    assert not result['converged']
+    assert result['n_paths'] == 4000
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from src.backtest import backtest_hedges, rolling_gbm_params
+from src.fx_simulator import estimate_gbm_params
+from tests.conftest import synthetic_market_data
+
+def test_rolling_gbm_params_match_estimate_gbm_params():
+    spots = synthetic_market_data()['spot_mid']
+    for use_zero_mu in (True, False):
+        params = rolling_gbm_params(spots=spots, window=60, steps_per_year=252, use_zero_mu=use_zero_mu)
+        assert params.iloc[:60].isna().all().all()
+        for i in (60, 300, len(spots) - 1):
+            mu, sigma = estimate_gbm_params(spots=spots.iloc[i - 60:i + 1], steps_per_year=252, use_zero_mu=use_zero_mu)
+            np.testing.assert_allclose(params.iloc[i], [mu, sigma], rtol=1e-9, atol=1e-12)
+
+def test_backtest_replays_the_schedule_from_each_start(cashflows, global_variables):
+    gv = global_variables
+    market_data = synthetic_market_data(start='2015-01-01')
+    result = backtest_hedges(market_data=market_data, cashflows=cashflows, global_variables=gv, window=120)
+    summary = result['summary']
+
+    expected = {'s0', 'mu', 'sigma', 'vol_1y', 'vol_5y', 'premium', 'n_realised', 'complete'}
+    expected |= {f'{name}_{field}' for name in ('unhedged', 'forward', 'option') for field in ('usd', 'hedge_pnl', 'npv')}
+    assert set(summary.columns) == expected
+    assert summary.index[0] == market_data.index[120]
+    assert summary['complete'].any() and not summary['complete'].all()
+    assert summary.loc[~summary['complete'], 'unhedged_npv'].isna().all()
+
+    # One complete start date by hand: EUR cashflows at the realised spot mids, inflows forward-hedged at h
+    start = summary.index[summary['complete']][10]
+    row = summary.loc[start]
+    dates = start + (pd.DatetimeIndex(cashflows.index) - gv.analysis_start_date)
+    spot_T = market_data['spot_mid'].reindex(dates, method='pad').to_numpy()
+    cf = cashflows['cf_eur'].to_numpy()
+    tau = (pd.DatetimeIndex(cashflows.index) - gv.analysis_start_date).days.to_numpy() / 365.0
+    forwards = row['s0'] * np.exp((gv.r_domestic - gv.r_foreign) * tau)
+    hedge = np.where(cf > 0, gv.hedging_ratio * cf, 0.0) * (forwards - spot_T)
+    np.testing.assert_allclose(result['cashflows_usd']['forward'].loc[start].to_numpy(), cf * spot_T + hedge, rtol=1e-12)
+    assert np.isclose(row['forward_hedge_pnl'], hedge.sum(), rtol=1e-12)
+    assert np.isclose(row['option_hedge_pnl'], np.maximum(hedge, 0.0).sum() - row['premium'], rtol=1e-12)
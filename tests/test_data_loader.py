@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from src.data_loader import market_data_loader
+
+def _write_workbook(
+        path,
+        spots: list[float]
+) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Sheet1'
+    ws.append(['Dates', 'EURUSD Spot Rate', 'EURUSD Spot Rate', 'EURUSD Spot Rate'])
+    ws.append([None, None, None, None])
+    ws.append(['Dates', 'PX_BID', 'PX_MID', 'PX_ASK'])
+    for date, spot in zip(pd.bdate_range('2025-01-01', periods=len(spots)), spots):
+        ws.append([date.to_pydatetime(), spot - 1e-4, spot, spot + 1e-4])
+    wb.save(path)
+
+def test_cached_market_data_matches_source_and_is_writable(tmp_path):
+    path = tmp_path / 'market.xlsx'
+    _write_workbook(path, [1.10, 1.11, 1.12])
+    expected = market_data_loader(path=str(path))
+    for _ in range(2):                                      # Miss, then memory-mapped hit
+        cached = market_data_loader(path=str(path), cache_dir=str(tmp_path / 'cache'))
+        pd.testing.assert_frame_equal(cached, expected, check_freq=False, check_index_type=False)
+    cached.iloc[0, 0] = 0.0
+    assert market_data_loader(path=str(path), cache_dir=str(tmp_path / 'cache')).iloc[0, 0] != 0.0
+
+def test_cache_distinguishes_sources_with_the_same_name(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    _write_workbook(tmp_path / 'a' / 'market.xlsx', [1.10, 1.11])
+    _write_workbook(tmp_path / 'b' / 'market.xlsx', [1.20, 1.21])
+    cache_dir = str(tmp_path / 'cache')
+    a = market_data_loader(path=str(tmp_path / 'a' / 'market.xlsx'), cache_dir=cache_dir)
+    b = market_data_loader(path=str(tmp_path / 'b' / 'market.xlsx'), cache_dir=cache_dir)
+    assert not np.allclose(a['spot_mid'].to_numpy(), b['spot_mid'].to_numpy())
+
+def test_concurrent_cache_writers_leave_no_temporary_files(tmp_path):
+    path = tmp_path / 'market.xlsx'
+    _write_workbook(path, [1.10, 1.11, 1.12, 1.13])
+    cache_dir = tmp_path / 'cache'
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        frames = list(pool.map(lambda _: market_data_loader(path=str(path), cache_dir=str(cache_dir)), range(8)))
+    for frame in frames:
+        np.testing.assert_array_equal(frame['spot_mid'].to_numpy(), [1.10, 1.11, 1.12, 1.13])
+    assert not list(cache_dir.glob('*.tmp'))
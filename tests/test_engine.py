@@ -0,0 +1,46 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.engine import iter_spot_chunks, run_chunked
+from src.parallel import run_parallel
+from tests.conftest import MU, S0, SIGMA, assert_same_metrics, run_strategies
+
+def test_run_chunked_independent_of_chunk_size(global_variables, cashflows):
+    reference = run_strategies(run_chunked, global_variables, cashflows)
+    for chunk_size in (257, 3000, 5000):
+        assert_same_metrics(reference, run_strategies(run_chunked, replace(global_variables, chunk_size=chunk_size), cashflows))
+
+def test_iter_spot_chunks_path_ranges_match_full_run(cashflows, global_variables):
+    kwargs = dict(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                  sample_dates=cashflows.index, n_paths=5000, steps_per_year=252, seed=9, block_size=1000)
+    full = np.concatenate([spots for _, _, spots in iter_spot_chunks(**kwargs, chunk_size=700)])
+    assert full.shape[0] == 5000
+    part = np.concatenate([spots for _, _, spots in iter_spot_chunks(**kwargs, chunk_size=400, paths=slice(1300, 3700))])
+    np.testing.assert_array_equal(part, full[1300:3700])
+
+def test_em_blocks_stop_at_n_paths(cashflows, global_variables):
+    kwargs = dict(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                  sample_dates=cashflows.index, n_paths=2500, steps_per_year=252, seed=9, block_size=1000, scheme='em')
+    full = np.concatenate([spots for _, _, spots in iter_spot_chunks(**kwargs, chunk_size=2500)])
+    part = np.concatenate([spots for _, _, spots in iter_spot_chunks(**kwargs, chunk_size=300, paths=slice(900, 2500))])
+    np.testing.assert_array_equal(part, full[900:])
+    # The last block holds only paths 2000..2499; the full blocks are unchanged by n_paths
+    longer = next(iter_spot_chunks(**{**kwargs, 'n_paths': 3000}, chunk_size=2000))[2]
+    np.testing.assert_array_equal(longer, full[:2000])
+
+@pytest.mark.parametrize('scheme', ['em', 'milstein'])
+def test_run_chunked_follows_discretization_method(global_variables, cashflows, scheme):
+    gv = replace(global_variables, discretization_method=scheme)
+    reference = run_strategies(run_chunked, gv, cashflows)
+    assert_same_metrics(reference, run_strategies(run_chunked, replace(gv, chunk_size=777), cashflows))
+    assert_same_metrics(reference, run_strategies(run_parallel, gv, cashflows, max_workers=1))
+    exact = run_strategies(run_chunked, global_variables, cashflows)
+    assert not np.array_equal(reference['unhedged']['npv'], exact['unhedged']['npv'])
+    # Same model, so the discretised NPVs agree with the exact ones in distribution
+    assert abs(np.mean(reference['unhedged']['npv']) / np.mean(exact['unhedged']['npv']) - 1) < 0.02
+
+def test_unknown_discretization_method_raises(global_variables, cashflows):
+    with pytest.raises(ValueError):
+        run_strategies(run_chunked, replace(global_variables, discretization_method='rk4'), cashflows)
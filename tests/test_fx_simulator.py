@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.fx_simulator import _brownian_bridge, expected_spots, simulate_gbm_paths
+from tests.conftest import MU, S0, SIGMA
+
+def test_brownian_bridge_matches_cumulative_increments_in_distribution():
+    times = np.arange(1, 9, dtype=float)
+    z = np.random.default_rng(2).standard_normal(size=(200_000, times.size))
+    W = _brownian_bridge(z, times)
+    cov = np.cov(W, rowvar=False)
+    np.testing.assert_allclose(cov, np.minimum.outer(times, times), atol=0.1)
+
+def test_sample_dates_columns_follow_grid_dates(cashflows, global_variables):
+    dates, spots = simulate_gbm_paths(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                                      end=cashflows.index.max(), n_paths=20_000, steps_per_year=252, seed=4,
+                                      sample_dates=cashflows.index)
+    assert spots.shape == (20_000, len(dates))
+    assert (dates.get_indexer(cashflows.index, method='pad') >= 0).all()
+    # Exact GBM: log spots are normal with variance sigma^2 t
+    t = pd.bdate_range(global_variables.analysis_start_date, dates[-1]).get_indexer(dates) / 252
+    np.testing.assert_allclose(np.log(spots / S0).var(axis=0), SIGMA ** 2 * t, rtol=0.05)
+
+def test_seed_compatible_matches_full_grid(cashflows, global_variables):
+    kwargs = dict(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                  end=cashflows.index.max(), n_paths=300, steps_per_year=252, seed=11)
+    dates, full = simulate_gbm_paths(**kwargs)
+    sampled_dates, sampled = simulate_gbm_paths(**kwargs, sample_dates=cashflows.index, seed_compatible=True,
+                                                block_elements=10_000)
+    idx = dates.get_indexer(sampled_dates)
+    assert (idx >= 0).all()
+    np.testing.assert_array_equal(sampled, full[:, idx])
+
+def test_expected_spots_is_the_simulated_mean(cashflows, global_variables):
+    start = global_variables.analysis_start_date
+    dates, spots = simulate_gbm_paths(s0=S0, mu=0.03, sigma=SIGMA, start=start, end=cashflows.index.max(),
+                                      n_paths=2**14, steps_per_year=252, seed=8, sample_dates=cashflows.index,
+                                      variance_reduction='sobol')
+    np.testing.assert_allclose(spots.mean(axis=0), expected_spots(S0, 0.03, start, dates, 252), rtol=1e-3)
+
+def test_antithetic_paths_mirror_log_returns(cashflows, global_variables):
+    _, spots = simulate_gbm_paths(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                                  end=cashflows.index.max(), n_paths=1000, steps_per_year=252, seed=8,
+                                  sample_dates=cashflows.index, variance_reduction='antithetic')
+    drift = 2 * np.log(expected_spots(S0, MU - 0.5 * SIGMA ** 2, global_variables.analysis_start_date,
+                                      cashflows.index, 252) / S0)
+    np.testing.assert_allclose(np.log(spots[:500] / S0) + np.log(spots[500:] / S0), np.broadcast_to(drift, (500, drift.size)),
+                               atol=1e-10)
+
+def test_float32_mode_matches_float64(cashflows, global_variables):
+    kwargs = dict(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                  end=cashflows.index.max(), n_paths=200, steps_per_year=252, seed=5)
+    _, full = simulate_gbm_paths(**kwargs)
+    _, lean = simulate_gbm_paths(**kwargs, dtype=np.float32, block_elements=50_000)
+    assert lean.dtype == np.float32
+    assert np.abs(lean / full - 1).max() < 1e-7
+
+def test_out_buffer_is_filled_in_place(cashflows, global_variables):
+    kwargs = dict(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                  end=cashflows.index.max(), n_paths=200, steps_per_year=252, seed=5, sample_dates=cashflows.index)
+    _, reference = simulate_gbm_paths(**kwargs)
+    out = np.empty(reference.shape)
+    _, paths = simulate_gbm_paths(**kwargs, out=out, block_elements=100)
+    assert paths is out
+    np.testing.assert_array_equal(out, reference)
+    with pytest.raises(ValueError):
+        simulate_gbm_paths(**kwargs, out=np.empty((10, 3)))
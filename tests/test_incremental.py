@@ -0,0 +1,82 @@
+import warnings
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import get_spot_prices
+from src.engine import iter_spot_chunks, run_chunked
+from src.fx_simulator import estimate_gbm_params
+from src.incremental import IncrementalRun
+from tests.conftest import assert_same_metrics, synthetic_market_data
+
+def _incremental(market_data, cashflows, global_variables, **kwargs) -> IncrementalRun:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return IncrementalRun(market_data, cashflows, global_variables, **kwargs)
+
+def _update(run, market_data) -> dict:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return run.update(market_data)
+
+def test_first_run_matches_engine(cashflows, global_variables):
+    gv = global_variables
+    run = _incremental(synthetic_market_data(), cashflows, gv)
+    inputs = run.inputs
+    assert inputs['analysis_date'] == gv.analysis_start_date
+
+    chunks = iter_spot_chunks(
+        s0=inputs['s0'], mu=inputs['mu'], sigma=inputs['sigma'], start=gv.analysis_start_date,
+        sample_dates=cashflows.index, n_paths=gv.n_paths, steps_per_year=gv.steps_per_year, seed=gv.seed,
+        chunk_size=gv.chunk_size)
+    np.testing.assert_array_equal(run.spots, np.concatenate([spots for _, _, spots in chunks]))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = run_chunked(gv, inputs['s0'], inputs['mu'], inputs['sigma'], cashflows, inputs['vol_1y'], inputs['vol_5y'])
+    assert_same_metrics(run.metrics(), {name: expected[name] for name in run.performance})
+
+def test_appended_rows_merge_into_the_moments(cashflows, global_variables):
+    gv = replace(global_variables, use_zero_mu=False)
+    run = _incremental(synthetic_market_data(end='2025-06-30'), cashflows, gv)
+    market = synthetic_market_data(end='2025-09-30')
+    result = _update(run, market)
+    assert not result['full_recalibration']
+    assert result['new_dates'] == list(pd.bdate_range('2025-07-01', '2025-09-30'))
+    mu, sigma = estimate_gbm_params(spots=get_spot_prices(market_data=market, price='mid'),
+                                    steps_per_year=gv.steps_per_year, use_zero_mu=False)
+    assert np.isclose(run.inputs['mu'], mu, rtol=1e-10) and np.isclose(run.inputs['sigma'], sigma, rtol=1e-12)
+
+    revised = market.copy()
+    revised.iloc[10, revised.columns.get_loc('spot_mid')] *= 1.01
+    assert _update(run, revised)['full_recalibration']
+
+def test_only_strategies_with_changed_inputs_are_re_evaluated(cashflows, global_variables):
+    market = synthetic_market_data()
+    run = _incremental(market, cashflows, global_variables)
+    unhedged = run.performance['unhedged']
+    assert _update(run, market)['recomputed'] == []
+
+    revised = market.copy()
+    revised.loc[global_variables.analysis_start_date, ['1y_atm_vol_ask', '5y_atm_vol_ask']] += 0.5
+    result = _update(run, revised)
+    assert result['recomputed'] == ['option'] and result['new_dates'] == []
+    assert run.performance['unhedged'] is unhedged
+
+def test_rolling_past_a_cashflow_date(cashflows, global_variables):
+    first_cashflow = cashflows.index[0]
+    run = _incremental(synthetic_market_data(end='2025-09-26'), cashflows, global_variables, roll_analysis_date=True)
+    assert run.spots.shape == (global_variables.n_paths, len(cashflows))
+
+    result = _update(run, synthetic_market_data(end='2025-10-06'))
+    assert result['recomputed'] == ['unhedged', 'forward', 'option']
+    assert run.inputs['analysis_date'] == pd.Timestamp('2025-10-06') > first_cashflow
+    assert run.spots.shape == (global_variables.n_paths, len(cashflows) - 1)
+    assert run.path_dates[0] > first_cashflow
+    assert np.isfinite(run.metrics()['forward']['npv']).all()
+
+    # Without rolling the analysis date stays put and every cashflow is still evaluated
+    fixed = _incremental(synthetic_market_data(end='2025-10-06'), cashflows, global_variables)
+    assert fixed.inputs['analysis_date'] == global_variables.analysis_start_date
+    assert fixed.spots.shape == (global_variables.n_paths, len(cashflows))
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src import instrumentation
+from src.fx_simulator import gbm_model, simulate_gbm_paths, simulate_sde_paths
+from src.instrumentation import count, instrument, profile
+from src.metrics.performance import irr, irr_batch
+from tests.test_performance import _usd_cashflows
+
+@instrument('outer')
+def _outer(n):
+    return sum(_inner() for _ in range(n))
+
+@instrument('inner')
+def _inner():
+    count('inner.calls')
+    return np.ones(10_000).sum()
+
+def test_stages_nest_and_count_calls():
+    with profile() as profiler:
+        _outer(3)
+        _outer(2)
+    report = profiler.report()
+    assert report['stages']['outer']['calls'] == 2
+    assert report['stages']['inner']['calls'] == 5
+    assert report['counters'] == {'inner.calls': 5}
+    assert report['stages']['outer']['wall_s'] >= report['stages']['inner']['wall_s']
+    assert report['wall_s'] >= report['stages']['outer']['wall_s']
+    assert 'peak_mb' not in report['stages']['outer']
+
+def test_disabled_outside_profile():
+    with profile() as profiler:
+        pass
+    _outer(2)
+    assert instrumentation._ACTIVE is None
+    assert profiler.report()['stages'] == {} and profiler.report()['counters'] == {}
+
+def test_memory_peak_includes_sub_stages():
+    @instrument('allocate')
+    def allocate():
+        return np.ones(2**20).sum()             # 8 MB
+
+    @instrument('wrapper')
+    def wrapper():
+        return allocate()
+
+    with profile(memory=True) as profiler:
+        wrapper()
+    stages = profiler.report()['stages']
+    assert stages['allocate']['peak_mb'] >= 7.5
+    assert stages['wrapper']['peak_mb'] >= stages['allocate']['peak_mb']
+
+def test_irr_counters_and_json(cashflows, paths, tmp_path):
+    cfs = _usd_cashflows(cashflows, paths)[:20]
+    start = cashflows.index[0]
+    with profile() as profiler:
+        irr_batch(cashflow_dates=cashflows.index, cashflows_matrix=cfs, start_date=start)
+        for row in cfs[:5]:
+            irr(cashflow_dates=cashflows.index, cashflows=row, start_date=start)
+    report = json.loads(profiler.to_json(tmp_path / 'profile.json'))
+    assert report == json.loads((tmp_path / 'profile.json').read_text())
+    assert report['stages']['metrics.irr_batch']['calls'] == 1
+    assert report['stages']['metrics.irr']['calls'] == 5
+    assert report['counters']['irr.paths'] == 25
+    assert report['counters']['irr.brentq_calls'] == 5
+    assert report['derived']['irr_nan_rate'] == 0
+    assert report['derived']['brentq_iterations_per_call'] > 0
+
+def test_em_simulation_is_timed_once():
+    kwargs = dict(start=pd.Timestamp('2025-08-01'), end=pd.Timestamp('2025-12-31'), n_paths=100, steps_per_year=252,
+                  seed=1, scheme='em')
+    with profile() as profiler:
+        simulate_gbm_paths(s0=1.17, mu=0.0, sigma=0.08, **kwargs)
+    assert profiler.report()['stages']['simulation']['calls'] == 1
+    with profile() as profiler:
+        simulate_sde_paths(model=gbm_model(s0=1.17, mu=0.0, sigma=0.08), **kwargs)
+    assert profiler.report()['stages']['simulation']['calls'] == 1
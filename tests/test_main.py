@@ -0,0 +1,82 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import main
+from src.engine import iter_spot_chunks
+from src.global_variables import GlobalVariables
+from tests.conftest import synthetic_market_data
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _write_market_workbook(
+        path: Path
+) -> None:
+    """
+    synthetic_market_data in the Bloomberg layout market_data_loader reads.
+    """
+    market = synthetic_market_data(end='2025-08-29')
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Sheet1'
+    tickers = ['EURUSD Spot Rate', 'EURUSD 1Y ATM Implied Vol', 'EURUSD 5Y ATM Implied Vol']
+    ws.append(['Dates'] + [ticker for ticker in tickers for _ in range(3)])
+    ws.append([None] * 10)
+    ws.append(['Dates'] + ['PX_BID', 'PX_MID', 'PX_ASK'] * 3)
+    for date, row in zip(market.index, market.to_numpy()):
+        ws.append([date.to_pydatetime(), *row.tolist()])
+    wb.save(path)
+
+def _write_configs(
+        tmp_path: Path
+) -> list[str]:
+    _write_market_workbook(tmp_path / 'market.xlsx')
+    common = {'market_data_path': str(tmp_path / 'market.xlsx'), 'n_paths': 1500, 'chunk_size': 600, 'seed': 11,
+              'cache_dir': None}
+    configs = {
+        'base': {**common, 'hedging_ratio': 0.5},
+        'no_options': {**common, 'hedging_ratio': 0.9, 'strategies': ['unhedged', 'forward']},
+    }
+    for name, config in configs.items():
+        (tmp_path / f'{name}.json').write_text(json.dumps(config))
+    return [str(tmp_path / f'{name}.json') for name in configs]
+
+def test_cli_smoke_run(tmp_path):
+    configs = _write_configs(tmp_path)
+    assert main.main([*configs, '--output-dir', str(tmp_path / 'out'), '--profile', str(tmp_path / 'profile.json')]) == 0
+
+    base, no_options = tmp_path / 'out' / 'base', tmp_path / 'out' / 'no_options'
+    for directory in (base, no_options):
+        assert {p.name for p in directory.iterdir()} == {'config.json', 'run.json', 'risk_summary.csv', 'metrics.npz'}
+    assert set(pd.read_csv(base / 'risk_summary.csv')['strategy']) == {'unhedged', 'forward', 'option'}
+    assert set(pd.read_csv(no_options / 'risk_summary.csv')['strategy']) == {'unhedged', 'forward'}
+    assert json.loads((no_options / 'config.json').read_text())['strategies'] == ['unhedged', 'forward']
+
+    # Same simulation inputs: one set of paths, so the unhedged metrics agree and only the hedges differ
+    a, b = np.load(base / 'metrics.npz'), np.load(no_options / 'metrics.npz')
+    assert a['unhedged_npv'].shape == (1500,)
+    np.testing.assert_array_equal(a['unhedged_npv'], b['unhedged_npv'])
+    assert not np.array_equal(a['forward_npv'], b['forward_npv'])
+    assert 'option_npv' not in b
+    assert json.loads((tmp_path / 'profile.json').read_text())['stages']['simulation']['calls'] >= 1
+
+def test_simulate_matches_engine_chunks(cashflows):
+    gv = GlobalVariables(n_paths=2500, chunk_size=700, seed=5)
+    inputs = {'s0': 1.17, 'mu': 0.0, 'sigma': 0.08}
+    dates, spots = main._simulate(inputs, cashflows, gv)
+    expected = np.concatenate([s for _, _, s in iter_spot_chunks(
+        s0=1.17, mu=0.0, sigma=0.08, start=gv.analysis_start_date, sample_dates=cashflows.index, n_paths=2500,
+        steps_per_year=gv.steps_per_year, seed=5, chunk_size=2500)])
+    assert spots.shape == (2500, dates.size)
+    np.testing.assert_array_equal(spots, expected)
+
+def test_scipy_not_loaded_without_options(tmp_path):
+    configs = _write_configs(tmp_path)
+    script = (f'import sys, main; main.main([{configs[1]!r}, "--output-dir", {str(tmp_path / "out")!r}]); '
+              f'sys.exit("scipy" in sys.modules)')
+    assert subprocess.run([sys.executable, '-W', 'ignore', '-c', script], cwd=ROOT).returncode == 0
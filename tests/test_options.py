@@ -0,0 +1,26 @@
+import numpy as np
+from scipy.stats import norm
+
+from src.hedges.options import _garman_kohlhagen_put, garman_kohlhagen_price
+
+def _reference_put(s0, K, r_domestic, r_foreign, tau, vol):
+    # Scalar Garman-Kohlhagen put as originally implemented
+    if tau <= 0.0:
+        return float(max(K - s0, 0.0))
+    forward = s0 * np.exp((r_domestic - r_foreign) * tau)
+    df_d = np.exp(-r_domestic * tau)
+    if vol <= 0.0:
+        return float(df_d * max(K - forward, 0.0))
+    sqrt_t = np.sqrt(tau)
+    d1 = (np.log(forward / K) + 0.5 * vol * vol * tau) / (vol * sqrt_t)
+    d2 = d1 - vol * sqrt_t
+    return float(df_d * (K * norm.cdf(-d2) - forward * norm.cdf(-d1)))
+
+def test_garman_kohlhagen_matches_scalar_put():
+    grid = [(K, tau, vol) for K in (1.0, 1.17, 1.3) for tau in (0.0, 0.25, 1.0, 5.2) for vol in (0.0, 0.07, 0.15)]
+    expected = [_reference_put(1.17, K, 0.0439, 0.01827, tau, vol) for K, tau, vol in grid]
+    K, tau, vol = map(np.array, zip(*grid))
+    vectorised = garman_kohlhagen_price(s0=1.17, K=K, r_domestic=0.0439, r_foreign=0.01827, tau=tau, vol=vol, kind='put')
+    np.testing.assert_allclose(vectorised, expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(
+        [_garman_kohlhagen_put(1.17, k, 0.0439, 0.01827, t, v) for k, t, v in grid], expected, rtol=1e-12, atol=1e-15)
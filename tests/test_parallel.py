@@ -0,0 +1,15 @@
+from dataclasses import replace
+
+import pytest
+
+from src.engine import run_chunked
+from src.parallel import run_parallel
+from tests.conftest import assert_same_metrics, run_strategies
+
+@pytest.mark.parametrize('max_workers, shards_per_worker', [(1, 4), (2, 1), (3, 2)])
+def test_run_parallel_matches_run_chunked(global_variables, cashflows, max_workers, shards_per_worker):
+    gv = replace(global_variables, n_paths=9000)
+    parallel = run_strategies(run_parallel, gv, cashflows, max_workers=max_workers, shards_per_worker=shards_per_worker)
+    chunked = run_strategies(run_chunked, gv, cashflows)
+    assert_same_metrics(chunked, parallel)
+    assert parallel['option']['premium'] == chunked['option']['premium']
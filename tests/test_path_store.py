@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.path_store import PathStore
+from tests.conftest import MU, S0, SIGMA
+
+PARAMS = dict(s0=S0, mu=MU, sigma=SIGMA, start=pd.Timestamp('2025-10-01'), end=pd.Timestamp('2026-10-01'),
+              n_paths=64, steps_per_year=252, seed=1)
+
+def test_key_accepts_dtypes():
+    assert PathStore.key(**PARAMS, dtype=np.float32) == PathStore.key(**PARAMS, dtype='float32')
+    assert PathStore.key(**PARAMS, dtype=np.float32) != PathStore.key(**PARAMS, dtype=np.float64)
+
+def test_simulate_float32_round_trip(tmp_path):
+    store = PathStore(root=tmp_path)
+    dates, paths = store.simulate(**PARAMS, dtype=np.float32)
+    cached_dates, cached = store.simulate(**PARAMS, dtype=np.float32)
+    assert cached.dtype == np.float32
+    assert (cached_dates == dates).all()
+    np.testing.assert_array_equal(cached, paths)
+
+def test_simulate_with_out_bypasses_store(tmp_path):
+    store = PathStore(root=tmp_path)
+    dates, reference = store.simulate(**PARAMS)
+    out = np.empty_like(reference)
+    _, paths = store.simulate(**PARAMS, out=out)
+    assert paths is out
+    np.testing.assert_array_equal(out, reference)
+
+def test_key_applies_defaults():
+    assert PathStore.key(**PARAMS) == PathStore.key(**PARAMS, scheme='exact', sample_dates=None, dtype=np.float64)
+    assert PathStore.key(**PARAMS) == PathStore.key(**{**PARAMS, 'start': '2025-10-01', 'n_paths': np.int64(64)})
+    assert PathStore.key(**PARAMS) != PathStore.key(**PARAMS, scheme='em')
+
+def test_key_ignores_arguments_that_leave_paths_unchanged(tmp_path):
+    assert PathStore.key(**PARAMS) == PathStore.key(**PARAMS, block_elements=1000, seed_compatible=True)
+    assert PathStore.key(**PARAMS, scheme='EM') == PathStore.key(**PARAMS, scheme='em')
+    sampled = dict(PARAMS, sample_dates=pd.DatetimeIndex(['2026-04-01', '2026-10-01']))
+    assert PathStore.key(**sampled) != PathStore.key(**sampled, seed_compatible=True)
+
+    store = PathStore(root=tmp_path)
+    _, paths = store.simulate(**PARAMS, dtype=np.float32)
+    _, relaid = store.simulate(**PARAMS, dtype=np.float32, block_elements=1000)
+    np.testing.assert_array_equal(relaid, paths)
+    assert len(list(tmp_path.glob('*.paths.npy'))) == 1
+
+def test_evict_removes_least_recently_used_entries(tmp_path):
+    store = PathStore(root=tmp_path)
+    keys = []
+    for seed in (1, 2):
+        store.simulate(**dict(PARAMS, seed=seed))
+        keys.append(PathStore.key(**dict(PARAMS, seed=seed)))
+    entry_bytes = sum(p.stat().st_size for p in tmp_path.glob(f'{keys[0]}.*'))
+    for age, key in enumerate(keys):                        # seed 1 oldest, then seed 2
+        os.utime(tmp_path / f'{key}.paths.npy', ns=(age + 1, age + 1))
+    assert store.get(keys[0]) is not None                   # Touch seed 1: seed 2 is now least recently used
+
+    store.max_bytes = int(2.5 * entry_bytes)
+    store.simulate(**dict(PARAMS, seed=3))
+    assert store.get(keys[0]) is not None
+    assert store.get(keys[1]) is None
+    assert store.get(PathStore.key(**dict(PARAMS, seed=3))) is not None
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,47 @@
+import warnings
+
+import numpy as np
+
+from src.metrics.performance import (
+    discount_factors, irr, irr_batch, moic, moic_batch, npv, npv_batch, terminal_value, terminal_value_batch)
+
+def _usd_cashflows(cashflows, paths):
+    dates, spots = paths
+    idx = dates.get_indexer(cashflows.index, method='pad')
+    return cashflows['cf_eur'].to_numpy() * spots[:, idx]
+
+def test_irr_batch_matches_scalar_irr(cashflows, paths):
+    cfs = _usd_cashflows(cashflows, paths)[:100]
+    batch = irr_batch(cashflow_dates=cashflows.index, cashflows_matrix=cfs, start_date=cashflows.index[0])
+    scalar = [irr(cashflow_dates=cashflows.index, cashflows=row, start_date=cashflows.index[0]) for row in cfs]
+    np.testing.assert_allclose(batch, scalar, rtol=1e-9, atol=1e-12)
+
+def test_irr_batch_nan_rows(cashflows, paths):
+    cfs = _usd_cashflows(cashflows, paths)[:3].copy()
+    cfs[1] = np.abs(cfs[1])                 # All positive: no root
+    cfs[2, 1] = np.nan                      # Non-finite cashflow
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        batch = irr_batch(cashflow_dates=cashflows.index, cashflows_matrix=cfs, start_date=cashflows.index[0])
+        expected = irr(cashflow_dates=cashflows.index, cashflows=cfs[0], start_date=cashflows.index[0])
+        assert np.isnan(irr(cashflow_dates=cashflows.index, cashflows=cfs[1], start_date=cashflows.index[0]))
+    assert np.isclose(batch[0], expected, rtol=1e-9)
+    assert np.isnan(batch[1]) and np.isnan(batch[2])
+
+def test_npv_moic_and_terminal_batch_match_scalar(cashflows, paths):
+    cfs = _usd_cashflows(cashflows, paths)[:50]
+    dfs = discount_factors(cashflow_dates=cashflows.index, r=0.05)
+    charged = cfs.copy()
+    charged[:, 0] -= 1e5
+    np.testing.assert_allclose(
+        npv_batch(cashflows_matrix=cfs, discount_factors=dfs, premium=1e5),
+        [npv(cashflow_dates=cashflows.index, cashflows=row, r=0.05) for row in charged], rtol=1e-12)
+    np.testing.assert_allclose(moic_batch(cashflows_matrix=cfs, premium=1e5), [moic(row) for row in charged], rtol=1e-12)
+    np.testing.assert_allclose(terminal_value_batch(cashflows_matrix=cfs, premium=1e5),
+                               [terminal_value(row) for row in charged], rtol=1e-12)
+
+def test_moic_batch_without_outflows_is_nan():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = moic_batch(cashflows_matrix=np.array([[-1.0, 2.0], [1.0, 2.0], [0.0, 0.0]]))
+    np.testing.assert_array_equal(result, [2.0, np.nan, np.nan])
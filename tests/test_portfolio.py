@@ -0,0 +1,92 @@
+from dataclasses import replace
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.fx_simulator import simulate_gbm_paths
+from src.metrics.risk import METRIC_LOSS_MODES, risk_report
+from src.portfolio import Portfolio, evaluate_portfolio
+from src.strategies import METRICS, STRATEGY_REGISTRY, evaluate_strategies, register_strategy
+from tests.conftest import MU, S0, SIGMA, VOL_1Y, VOL_5Y
+
+def _loans(cashflows) -> dict:
+    later = cashflows.copy()
+    later.index = later.index + pd.DateOffset(months=3)
+    small = cashflows.iloc[:3] * 0.5
+    return {'A': cashflows, 'B': later, 'C': small}
+
+def _simulate(portfolio, global_variables):
+    return simulate_gbm_paths(s0=S0, mu=MU, sigma=SIGMA, start=global_variables.analysis_start_date,
+                              end=portfolio.dates.max(), n_paths=400, steps_per_year=252, seed=2,
+                              sample_dates=portfolio.dates)
+
+def _evaluate(portfolio, dates, spots, gv, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return evaluate_portfolio(portfolio, spots, dates, S0, VOL_1Y, VOL_5Y, gv, **kwargs)
+
+def _single(cashflows, dates, spots, gv, strategies=('unhedged', 'forward', 'option')):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return evaluate_strategies(spot_samples=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y,
+                                   vol_5y=VOL_5Y, global_variables=gv, strategies=strategies)
+
+def test_single_loan_book_matches_evaluate_strategies(cashflows, global_variables):
+    gv = replace(global_variables, premium=0.0)
+    portfolio = Portfolio.from_loans({'A': cashflows})
+    dates, spots = _simulate(portfolio, gv)
+    book = _evaluate(portfolio, dates, spots, gv)['aggregate']
+    single = _single(cashflows, dates, spots, gv)
+    for strategy in single:
+        assert book[strategy]['premium'] == pytest.approx(single[strategy]['premium'], rel=1e-12)
+        for metric in METRICS:
+            np.testing.assert_allclose(book[strategy][metric], single[strategy][metric], rtol=1e-9, err_msg=metric)
+
+def test_per_loan_stats_match_each_loan_alone(cashflows, global_variables):
+    gv = replace(global_variables, premium=0.0)
+    loans = _loans(cashflows)
+    portfolio = Portfolio.from_loans(loans)
+    dates, spots = _simulate(portfolio, gv)
+    summaries = _evaluate(portfolio, dates, spots, gv, loan_block=2)['loans']
+    for loan_id, loan_cashflows in loans.items():
+        single = _single(loan_cashflows, dates, spots, gv)
+        for strategy, performance in single.items():
+            row = summaries[strategy].loc[loan_id]
+            assert row['premium'] == pytest.approx(performance['premium'], rel=1e-12, abs=1e-9)
+            for metric in METRICS:
+                expected = risk_report(performance[metric], alpha=gv.alpha, loss_modes=(METRIC_LOSS_MODES[metric],))[0]
+                for stat in ('mean', 'p05', 'p95'):
+                    assert row[f'{metric}_{stat}'] == pytest.approx(expected[stat], rel=1e-8), (loan_id, strategy, metric)
+
+def test_loan_without_outflows_has_nan_moic(global_variables):
+    frame = pd.DataFrame({'loan_id': ['A', 'A', 'B'], 'cf': [-1e6, 1.2e6, 5e5]},
+                         index=pd.DatetimeIndex(['2025-10-01', '2027-10-01', '2026-10-01'], name='date'))
+    portfolio = Portfolio.from_frame(frame)
+    dates, spots = _simulate(portfolio, global_variables)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        loans = evaluate_portfolio(portfolio, spots, dates, S0, VOL_1Y, VOL_5Y, global_variables,
+                                   strategies=('unhedged',), loan_irr=False)['loans']['unhedged']
+    assert np.isnan(loans.loc['B', 'moic_mean'])
+    assert np.isfinite(loans.loc['A', 'moic_mean'])
+
+def test_registered_strategy_reaches_portfolio_mode(cashflows, global_variables):
+    @register_strategy('half_forward')
+    def _half_forward(spots_cf, context):
+        hedge, premium, info = STRATEGY_REGISTRY['forward'](spots_cf, context)
+        return 0.5 * hedge, premium, {**info, 'strategy': 'half_forward'}
+
+    try:
+        gv = replace(global_variables, premium=0.0)
+        portfolio = Portfolio.from_loans(_loans(cashflows))
+        dates, spots = _simulate(portfolio, gv)
+        result = _evaluate(portfolio, dates, spots, gv, strategies=('half_forward',), loan_irr=False)
+        expected = _evaluate(portfolio, dates, spots, replace(gv, hedging_ratio=0.5 * gv.hedging_ratio),
+                             strategies=('forward',), loan_irr=False)
+        np.testing.assert_allclose(result['aggregate']['half_forward']['npv'], expected['aggregate']['forward']['npv'], rtol=1e-12)
+    finally:
+        del STRATEGY_REGISTRY['half_forward']
+    with pytest.raises(ValueError):
+        _evaluate(portfolio, dates, spots, gv, strategies=('half_forward',))
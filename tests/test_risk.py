@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from src.metrics.risk import LOSS_THRESHOLDS, risk_report, risk_summary_for_metric
+
+@pytest.mark.parametrize('loss', sorted(LOSS_THRESHOLDS))
+def test_risk_report_matches_risk_summary_for_metric(loss):
+    rng = np.random.default_rng(0)
+    x = rng.normal(0.5, 1.0, size=(1001, 3))
+    x[::97, 1] = np.nan
+    reports = risk_report(x, alpha=0.95, loss_modes=(loss,))
+    for j, report in enumerate(reports):
+        expected = risk_summary_for_metric(x[:, j], alpha=0.95, loss=loss)
+        for key, value in expected.items():
+            np.testing.assert_allclose(report[key], value, rtol=1e-12, atol=1e-15, equal_nan=True, err_msg=key)
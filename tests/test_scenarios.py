@@ -0,0 +1,46 @@
+from dataclasses import replace
+import warnings
+
+import numpy as np
+import pytest
+
+from src.scenarios import scenario_grid
+from src.schedule import Schedule
+from src.strategies import METRICS, evaluate_strategies
+from tests.conftest import S0, VOL_1Y, VOL_5Y
+
+@pytest.mark.parametrize('hedge_ratio, forward_weight, strategy', [
+    (0.0, 0.0, 'unhedged'),
+    (0.0, 1.0, 'unhedged'),
+    (0.5, 1.0, 'forward'),
+    (1.0, 1.0, 'forward'),
+    (1.0, 0.0, 'option'),
+])
+def test_scenario_grid_matches_evaluate_strategies(global_variables, cashflows, paths, hedge_ratio, forward_weight, strategy):
+    dates, spots = paths
+    gv = replace(global_variables, hedging_ratio=hedge_ratio)
+    assert gv.premium != 0.0
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        grid = scenario_grid(spots=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y, vol_5y=VOL_5Y,
+                             global_variables=gv, hedge_ratios=(hedge_ratio,), moneyness=(1.0,),
+                             forward_weights=(forward_weight,))
+        expected = evaluate_strategies(spot_samples=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y,
+                                       vol_5y=VOL_5Y, global_variables=gv, strategies=(strategy,))[strategy]
+    for metric in METRICS:
+        np.testing.assert_allclose(grid['metrics'][metric][0], expected[metric], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=metric)
+
+def test_partial_put_hedge_pays_the_unhedged_share_of_the_fixed_premium(global_variables, cashflows, paths):
+    dates, spots = paths
+    gv = replace(global_variables, hedging_ratio=0.25)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        grid = scenario_grid(spots=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y, vol_5y=VOL_5Y,
+                             global_variables=gv, hedge_ratios=(0.25,), forward_weights=(0.0,))
+        option = evaluate_strategies(spot_samples=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y,
+                                     vol_5y=VOL_5Y, global_variables=gv, strategies=('option',))['option']
+    assert grid['scenarios']['fixed_premium'].iloc[0] == 0.75 * gv.premium
+    schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=dates, s0=S0, global_variables=gv)
+    np.testing.assert_allclose(option['npv'] - grid['metrics']['npv'][0],
+                               0.75 * gv.premium * schedule.discount_factors[0], rtol=1e-9)
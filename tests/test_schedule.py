@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.hedges.forwards import _forward_rates
+from src.metrics.performance import _yearfrac
+from src.schedule import Schedule
+from tests.conftest import S0
+
+def test_schedule_matches_notebook_date_work(cashflows, global_variables, paths):
+    gv = global_variables
+    dates, _ = paths
+    schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=dates, s0=S0, global_variables=gv)
+
+    np.testing.assert_array_equal(schedule.grid_idx, dates.get_indexer(cashflows.index, method='pad'))
+    year_fractions = [_yearfrac(start_date=gv.analysis_start_date, end_date=d) for d in cashflows.index]
+    np.testing.assert_allclose(schedule.year_fractions, year_fractions, rtol=1e-15)
+    np.testing.assert_allclose(schedule.irr_year_fractions,
+                               [_yearfrac(start_date=cashflows.index[0], end_date=d) for d in cashflows.index], rtol=1e-15)
+    np.testing.assert_allclose(schedule.discount_factors, (1 + gv.discount_rate) ** -np.asarray(year_fractions), rtol=1e-15)
+    np.testing.assert_allclose(schedule.forwards, _forward_rates(s0=S0, cashflow_dates=cashflows.index, r_domestic=gv.r_domestic,
+                                                                 r_foreign=gv.r_foreign, start_date=gv.analysis_start_date),
+                               rtol=1e-15)
+
+def test_schedule_is_read_only_and_rejects_early_cashflows(cashflows, global_variables, paths):
+    dates, _ = paths
+    schedule = Schedule.from_global_variables(cashflows=cashflows, path_dates=dates, s0=S0, global_variables=global_variables)
+    with pytest.raises(ValueError):
+        schedule.discount_factors[0] = 1.0
+    with pytest.raises(ValueError):
+        Schedule.from_global_variables(cashflows=cashflows, path_dates=dates[dates > pd.Timestamp('2026-01-01')], s0=S0,
+                                       global_variables=global_variables)
+
+def test_with_upfront_prepends_the_analysis_date(cashflows, global_variables, paths):
+    dates, _ = paths
+    upfront = Schedule.from_global_variables(cashflows=cashflows, path_dates=dates, s0=S0,
+                                             global_variables=global_variables).with_upfront()
+    assert upfront.cashflow_dates[0] == global_variables.analysis_start_date
+    assert upfront.grid_idx[0] == -1 and upfront.discount_factors[0] == 1.0 and upfront.cashflow_eur[0] == 0.0
+    np.testing.assert_allclose(upfront.irr_year_fractions, upfront.year_fractions)
@@ -0,0 +1,51 @@
+from dataclasses import replace
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.fx_simulator import simulate_gbm_paths
+from src.sensitivities import risk_sensitivities
+from src.strategies import evaluate_strategies
+from tests.conftest import MU, S0, SIGMA, VOL_1Y, VOL_5Y
+
+def _sensitivities(global_variables, cashflows, sigma=SIGMA, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return risk_sensitivities(global_variables, S0, MU, sigma, cashflows, VOL_1Y, VOL_5Y, **kwargs)
+
+def test_base_matches_a_direct_evaluation(global_variables, cashflows):
+    gv = replace(global_variables, n_paths=2000)
+    table = _sensitivities(gv, cashflows, parameters=('vol',))
+    dates, spots = simulate_gbm_paths(s0=S0, mu=MU, sigma=SIGMA, start=gv.analysis_start_date, end=cashflows.index.max(),
+                                      n_paths=gv.n_paths, steps_per_year=gv.steps_per_year, seed=gv.seed,
+                                      sample_dates=pd.DatetimeIndex(cashflows.index))
+    performance = evaluate_strategies(spot_samples=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y,
+                                      vol_5y=VOL_5Y, global_variables=gv, metrics=('npv',))
+    for strategy, perf in performance.items():
+        assert np.isclose(table.loc[(strategy, 'mean'), 'base'], perf['npv'].mean(), rtol=1e-10)
+
+def test_sensitivity_signs(global_variables, cashflows):
+    gv = replace(global_variables, n_paths=2000)
+    table = _sensitivities(gv, cashflows)
+    mean = table.xs('mean', level='stat')
+
+    # Net EUR inflows: NPV rises with the spot; hedging the inflows at fixed forwards / strikes leaves the EUR
+    # outflow exposed, the puts (delta above -1) less so than the forwards
+    assert mean.loc['unhedged', 's0'] > 0
+    assert mean.loc['unhedged', 's0'] > mean.loc['option', 's0'] > mean.loc['forward', 's0']
+    # Only the puts depend on the implied vol, through a higher premium
+    assert mean.loc['option', 'vol'] < 0
+    assert mean.loc['unhedged', 'vol'] == 0 and mean.loc['forward', 'vol'] == 0
+    # Higher USD rates raise the forwards the EUR inflows are sold at
+    assert mean.loc['forward', 'r_domestic'] > 0 > mean.loc['forward', 'r_foreign']
+    assert mean.loc['unhedged', 'r_domestic'] == 0
+
+def test_unhedged_delta_is_linear_in_s0(global_variables, cashflows):
+    gv = replace(global_variables, n_paths=2000, premium=0.0)
+    table = _sensitivities(gv, cashflows, parameters=('s0',), strategies=('unhedged',))
+    assert np.isclose(table.loc[('unhedged', 'mean'), 's0'], table.loc[('unhedged', 'mean'), 'base'] / S0, rtol=1e-8)
+
+def test_zero_sigma_gives_finite_sensitivities(global_variables, cashflows):
+    table = _sensitivities(replace(global_variables, n_paths=500), cashflows, sigma=0.0)
+    assert np.isfinite(table.to_numpy()).all()
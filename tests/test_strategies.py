@@ -0,0 +1,65 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from src.metrics.performance import irr, moic, npv, terminal_value
+from src.strategies import METRICS, STRATEGY_REGISTRY, evaluate_strategies, register_strategy
+from tests.conftest import S0, VOL_1Y, VOL_5Y
+
+@pytest.fixture
+def fixed_bonus_strategy():
+    @register_strategy('fixed_bonus')
+    def _fixed_bonus(spots_cf, context):
+        hedge = np.zeros_like(spots_cf)
+        hedge[:, -1] = 5e4
+        return hedge, 1e4, {'strategy': 'fixed_bonus', 'premium': 1e4}
+    yield 'fixed_bonus'
+    del STRATEGY_REGISTRY['fixed_bonus']
+
+def _evaluate(paths, cashflows, global_variables, strategies):
+    dates, spots = paths
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return evaluate_strategies(spot_samples=spots, path_dates=dates, cashflows=cashflows, s0=S0, vol_1y=VOL_1Y,
+                                   vol_5y=VOL_5Y, global_variables=global_variables, strategies=strategies)
+
+def _notebook_metrics(cashflow_dates, cashflows_usd, global_variables):
+    gv = global_variables
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return {
+            'irr': [irr(cashflow_dates=cashflow_dates, cashflows=row, start_date=cashflow_dates[0]) for row in cashflows_usd],
+            'moic': [moic(row) for row in cashflows_usd],
+            'npv': [npv(cashflow_dates=cashflow_dates, cashflows=row, r=gv.discount_rate, start_date=gv.analysis_start_date)
+                    for row in cashflows_usd],
+            'terminal': [terminal_value(row) for row in cashflows_usd],
+        }
+
+def test_unhedged_matches_notebook_loop(paths, cashflows, global_variables):
+    dates, spots = paths
+    result = _evaluate(paths, cashflows, global_variables, ('unhedged',))['unhedged']
+    cashflows_usd = cashflows['cf_eur'].to_numpy() * spots[:, dates.get_indexer(cashflows.index, method='pad')]
+    cashflows_usd[:, 0] -= global_variables.premium
+    expected = _notebook_metrics(cashflows.index, cashflows_usd, global_variables)
+    for metric in METRICS:
+        np.testing.assert_allclose(result[metric], expected[metric], rtol=1e-9, err_msg=metric)
+
+def test_registered_strategy_round_trip(paths, cashflows, global_variables, fixed_bonus_strategy):
+    dates, spots = paths
+    result = _evaluate(paths, cashflows, global_variables, ('unhedged', fixed_bonus_strategy))
+    assert set(result) == {'unhedged', 'fixed_bonus'}
+    assert result['fixed_bonus']['strategy'] == 'fixed_bonus'
+
+    # Upfront premium on the analysis date, hedge added to the loan cashflows
+    cashflow_dates = cashflows.index.insert(0, global_variables.analysis_start_date)
+    loan_usd = cashflows['cf_eur'].to_numpy() * spots[:, dates.get_indexer(cashflows.index, method='pad')]
+    loan_usd[:, -1] += 5e4
+    cashflows_usd = np.column_stack([np.full(len(spots), -1e4), loan_usd])
+    expected = _notebook_metrics(cashflow_dates, cashflows_usd, global_variables)
+    for metric in METRICS:
+        np.testing.assert_allclose(result['fixed_bonus'][metric], expected[metric], rtol=1e-9, err_msg=metric)
+
+def test_unknown_strategy_raises(paths, cashflows, global_variables):
+    with pytest.raises((KeyError, ValueError)):
+        _evaluate(paths, cashflows, global_variables, ('collar',))
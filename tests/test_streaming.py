@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.metrics.risk import risk_summary_for_metric
+from src.metrics.streaming import StreamingRiskSummary
+
+def test_lower_tail_sum_interpolates_above_buffer():
+    acc = StreamingRiskSummary(lo=-2.0, hi=-1.0, n_bins=4)
+    acc.update(np.array([-1.5, 1.0, 2.0, 4.0]))
+    below, above, cum = acc._sorted_layout()
+    assert acc._lower_tail_sum(2.5, below, above, cum) == -1.5 + 1.0 + 0.5 * 2.0
+    assert acc._lower_tail_sum(4.0, below, above, cum) == -1.5 + 1.0 + 2.0 + 4.0
+
+def test_streaming_matches_risk_summary_for_metric():
+    x = np.random.default_rng(1).normal(size=20_001)
+    acc = StreamingRiskSummary.from_sample(x[:2000], loss='npv_shortfall')
+    for chunk in np.array_split(x[2000:], 7):
+        acc.update(chunk)
+    expected = risk_summary_for_metric(x, loss='npv_shortfall')
+    summary = acc.summary()
+    assert summary['n'] == x.size
+    np.testing.assert_allclose([summary['mean'], summary['std']], [expected['mean'], expected['std']], rtol=1e-10)
+    bin_width = acc.edges[1] - acc.edges[0]
+    for key in ('p05', 'p50', 'p95', 'VaR95_loss', 'ES95_loss'):
+        assert abs(summary[key] - expected[key]) <= bin_width, key
+
+def test_merged_accumulators_match_single_pass():
+    x = np.random.default_rng(2).normal(size=9000)
+    single = StreamingRiskSummary.from_sample(x[:1000])
+    single.update(x[1000:])
+    parts = [single.empty_like().update(chunk) for chunk in np.array_split(x, 3)]
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    for key, value in single.summary().items():
+        np.testing.assert_allclose(merged.summary()[key], value, rtol=1e-10, err_msg=key)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from src.hedges.options import put_option_hedge_cashflows_usd
+from src.hedges.vol_surface import VolSurface
+from tests.conftest import S0
+
+def _market_data() -> pd.DataFrame:
+    quotes = {'atm_vol': (7.2, 8.0), '25_risk_reversal': (-0.6, -0.9), '25_bf': (0.2, 0.35)}
+    data = {}
+    for name, (one_y, five_y) in quotes.items():
+        for tenor, value in (('1y', one_y), ('5y', five_y)):
+            data.update({f'{tenor}_{name}_bid': [value - 0.1] * 3, f'{tenor}_{name}_mid': [value] * 3,
+                         f'{tenor}_{name}_ask': [value + 0.1] * 3})
+    return pd.DataFrame(data, index=pd.bdate_range('2025-07-28', periods=3, name='dates'))
+
+def test_from_market_data_uses_ask_quotes_in_decimals():
+    surface = VolSurface.from_market_data(_market_data())
+    np.testing.assert_allclose(surface.atm, [0.073, 0.081])
+    np.testing.assert_allclose(surface.risk_reversal, [-0.005, -0.008])
+    np.testing.assert_allclose(VolSurface.from_market_data(_market_data(), price='mid').atm, [0.072, 0.080])
+
+def test_atmf_strike_recovers_the_atm_vol():
+    surface = VolSurface.from_market_data(_market_data())
+    tau = np.array([0.0, 0.25, 1.0, 3.0, 5.0, 7.0])
+    forward = S0 * np.exp(0.025 * tau)
+    np.testing.assert_allclose(surface.vol_at_strike(tau, forward, forward), surface.atm_vol(tau), rtol=1e-12)
+
+def test_quoted_25_delta_vols_are_recovered():
+    surface = VolSurface.from_market_data(_market_data())
+    atm, rr, bf = surface.atm[0], surface.risk_reversal[0], surface.butterfly[0]
+    np.testing.assert_allclose(surface.vol_at_delta(1.0, [0.25, 0.75]), [atm + bf + rr / 2, atm + bf - rr / 2], rtol=1e-12)
+    # Strike round trip: the 25-delta put strike prices back at the 25-delta put vol
+    vol = atm + bf - rr / 2
+    strike = S0 * np.exp(-norm.ppf(0.75) * vol + 0.5 * vol ** 2)
+    np.testing.assert_allclose(surface.vol_at_strike(1.0, strike, S0, n_iter=50), vol, rtol=1e-8)
+
+def test_atmf_put_premium_unchanged_by_the_surface(cashflows, global_variables, paths):
+    gv = global_variables
+    dates, spots = paths
+    surface = VolSurface.from_market_data(_market_data())
+    kwargs = dict(spot_paths=spots, path_dates=dates, cashflow_dates=cashflows.index,
+                  cashflow_eur=cashflows['cf_eur'].to_numpy(), s0=S0, r_domestic=gv.r_domestic, r_foreign=gv.r_foreign,
+                  hedge_ratio=gv.hedging_ratio, start_date=gv.analysis_start_date,
+                  vol_1y=surface.atm[0], vol_5y=surface.atm[1])
+    _, flat_premium, _, flat_vols = put_option_hedge_cashflows_usd(**kwargs)
+    _, smile_premium, _, smile_vols = put_option_hedge_cashflows_usd(**kwargs, vol_surface=surface)
+    np.testing.assert_allclose(smile_vols, flat_vols, rtol=1e-12)
+    assert np.isclose(smile_premium, flat_premium, rtol=1e-12)